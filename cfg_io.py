@@ -0,0 +1,90 @@
+"""
+Config File I/O
+
+This module provides the JSON reading and writing shared by the setup scripts,
+the pipeline scripts and the web views.
+Parsed files are cached until their modification time changes, orjson is used
+for parsing when it's installed, and writes go to a unique temporary file that is
+swapped in so readers never see a partly written file.
+"""
+
+import os
+import copy
+import json
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parsed files keyed by absolute path, as (mtime_ns, data); reused while the file is unchanged
+_cache = {}
+
+def read_json(path):
+    """
+    Parse a JSON file, reusing the last result while its mtime is unchanged
+
+    Callers may change the returned data, so they always get a copy of the
+    cached one.
+
+    Raises:
+    -------
+    FileNotFoundError
+        If the file doesn't exist
+    json.JSONDecodeError
+        If the file isn't valid JSON (orjson's error is a subclass)
+    """
+    # Relative and absolute spellings of a file share one cache entry
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return copy.deepcopy(cached[1])
+
+    with open(path, 'rb') as f:
+        blob = f.read()
+    data = orjson.loads(blob) if orjson is not None else json.loads(blob)
+    _cache[path] = (mtime, copy.deepcopy(data))
+    return data
+
+def write_json(path, data, *, pretty=False):
+    """
+    Write data to a JSON file in a single write and swap it in atomically
+
+    Parameters:
+    -----------
+    path : str or Path
+        File to write
+    data : dict
+        Data to serialize
+    pretty : bool
+        Indent the JSON for people to read; compact otherwise
+    """
+    # Relative and absolute spellings of a file share one cache entry
+    path = os.path.abspath(path)
+    if pretty:
+        blob = json.dumps(data, indent=2)
+    else:
+        blob = json.dumps(data, separators=(',', ':'))
+
+    # A unique temporary file per write, so concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        # mkstemp creates the file as 0600, keep the permissions of the file being replaced
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _cache[path] = (os.stat(path).st_mtime_ns, copy.deepcopy(data))
@@ -0,0 +1,59 @@
+"""
+Diary State
+
+This module keeps the diary's current date in a small diary_state.json file, so
+the daily date change writes a few bytes instead of rewriting config.json. The
+"current_date" in config.json's diary_manager section is only used as a fallback
+until the state file exists.
+"""
+
+import os
+import json
+import logging
+
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'diary_state.json')
+
+def load_current_date(default=None):
+    """
+    Return the current diary date (YYMMDD) from the state file
+
+    Parameters:
+    -----------
+    default : str
+        Value to return if the state file doesn't exist or can't be read
+
+    Returns:
+    --------
+    str
+        The current diary date, or default
+    """
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("current_date") or default
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        logging.error(f"Error reading {STATE_FILE}: {str(e)}")
+        return default
+
+def save_current_date(new_date):
+    """
+    Save the current diary date to the state file
+
+    The file is written to a temporary path and swapped in, so a crash can't
+    leave a truncated state file behind.
+
+    Returns:
+    --------
+    bool
+        True if the date was saved
+    """
+    tmp_path = STATE_FILE + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"current_date": new_date}, f)
+        os.replace(tmp_path, STATE_FILE)
+        return True
+    except Exception as e:
+        logging.error(f"Error writing {STATE_FILE}: {str(e)}")
+        return False
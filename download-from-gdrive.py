@@ -9,8 +9,8 @@ from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 import time
 
-# Set stdout to use utf-8 encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Set stdout to use utf-8 encoding (in place, so importing this from the scheduler is safe)
+sys.stdout.reconfigure(encoding='utf-8')
 
 # If modifying these scopes, delete the token.pickle file
 SCOPES = ['https://www.googleapis.com/auth/drive']
@@ -11,13 +11,13 @@ This script is a modified version of Whisper's CLI that:
 """
 
 import sys
-import io
 import argparse
 import os
 import sys
 import traceback
 import warnings
 import json
+import functools
 from typing import List, Optional, Tuple, Union
 from datetime import datetime
 import re
@@ -37,7 +37,8 @@ except ImportError:
     print("Error: Whisper package not found. Please install it using pip.")
     sys.exit(1)
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Reconfigure in place, so importing this from the scheduler is safe
+sys.stdout.reconfigure(encoding='utf-8')
 
 def load_config(config_path="config.json"):
     """Load configuration from a JSON file."""
@@ -81,6 +82,7 @@ def load_config(config_path="config.json"):
         print(f"Error parsing {config_path}. Using default settings.")
         sys.exit(1)
 
+@functools.lru_cache(maxsize=1)
 def load_local_model(model_folder, model_name, device):
     """
     Load a Whisper model from the specified model folder
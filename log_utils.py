@@ -0,0 +1,57 @@
+"""
+Logging Utilities
+
+This module provides the logging setup shared by the pipeline scripts. Log records
+are handed to a queue and written to the log file and console by a background
+thread, so the code doing the logging never waits on disk writes.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def setup_queued_logging(log_file, level=logging.INFO):
+    """
+    Configure the root logger to write to log_file and the console via a background thread
+
+    Like logging.basicConfig, this does nothing if the root logger already has
+    handlers, so the first script to configure logging in a process decides where
+    its records go.
+
+    Parameters:
+    -----------
+    log_file : str
+        Path of the log file
+    level : int
+        Logging level for the root logger
+
+    Returns:
+    --------
+    logging.handlers.QueueListener
+        The started listener, or None if logging was already configured
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+
+    log_queue = queue.SimpleQueue()
+
+    # Records are formatted when queued, the listener's handlers just write them out
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        logging.FileHandler(log_file, delay=True),
+        logging.StreamHandler()
+    )
+    listener.start()
+
+    # Write out anything still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
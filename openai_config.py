@@ -3,10 +3,24 @@ Configuration settings for OpenAI API integration.
 This file contains settings for the OpenAI API integration used for processing transcriptions.
 """
 
+import os
+import json
+
+# setup_openai.py saves the API key here rather than editing this file
+API_KEY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openai_config.json')
+
+def _load_saved_api_key():
+    """Return the API key saved by setup_openai.py, or an empty string"""
+    try:
+        with open(API_KEY_FILE, 'rb') as f:
+            return json.loads(f.read()).get("api_key", "")
+    except (OSError, ValueError):
+        return ""
+
 # OpenAI API configuration
 OPENAI_CONFIG = {
-    # Your OpenAI API key (left empty for security - set in environment variable or fill in)
-    "api_key": "",  # Set your API key here or use environment variable OPENAI_API_KEY
+    # Your OpenAI API key (left empty for security - set in environment variable or run setup_openai.py)
+    "api_key": _load_saved_api_key(),  # Saved key from openai_config.json; environment variable OPENAI_API_KEY is used otherwise
     
     # The model to use for processing transcriptions
     "model": "gpt-3.5-turbo",  # Options: "gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo"
@@ -20,7 +34,14 @@ OPENAI_CONFIG = {
     
     # Cost control options
     "enable_caching": True,  # Cache identical requests to save on costs
+    "cache_max_entries": 1024,  # Least recently used responses are evicted beyond this
+    "cache_ttl_seconds": 3600,  # Cached responses expire after this many seconds
+    "semantic_cache": False,  # Reuse responses for near-duplicate prompts (costs one embedding call per miss)
+    "semantic_cache_threshold": 0.95,  # Minimum cosine similarity for a semantic cache hit
+    "embedding_model": "text-embedding-3-small",  # Model used to embed prompts for the semantic cache
     "track_usage": True,     # Track API usage in a log file
+    "stream_responses": False,  # Write the organized entry to the diary while it is generated (no caching or retries)
+    "combine_entries": False,  # Organize several recordings in one JSON request (falls back to one request each if the reply is malformed)
     
     # Response format options (for newer models)
     "response_format": "text",  # Can be "text" or "json"
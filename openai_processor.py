@@ -7,12 +7,15 @@ It replaces the local LLM processing with OpenAI's cloud-based API for faster pr
 
 import os
 import json
+import hashlib
 import logging
 import time
 import tiktoken
 from datetime import datetime
 import re
-from typing import Dict, List, Optional, Union, Any
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union, Any
 
 try:
     from openai import OpenAI
@@ -21,24 +24,31 @@ try:
 except ImportError:
     raise ImportError("OpenAI Python package is required. Install it with 'pip install openai'")
 
+# Optional faster tokenizer; tiktoken stays the exact fallback for unsupported models
+try:
+    from tokenx import count as _tokenx_count
+except ImportError:
+    _tokenx_count = None
+
 # Local imports
 from openai_config import OPENAI_CONFIG, USAGE_TRACKING, COST_ESTIMATES
+from log_utils import setup_queued_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(USAGE_TRACKING.get('log_file', 'openai_usage.log')),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging. Records are written by a background thread, so API calls
+# don't wait on the usage log file
+setup_queued_logging(USAGE_TRACKING.get('log_file', 'openai_usage.log'))
+
+# Patterns for parsing the model's analysis: one "## HEADING" section per match
+_SECTION_RE = re.compile(r'^[ \t]*##[ \t]+([^\n]+?)[ \t]*\n(.*?)(?=^[ \t]*##|\Z)', re.MULTILINE | re.DOTALL)
+_NUMBERED_RE = re.compile(r'^\d+\.')
 
-# Cache for API requests to save costs
-_api_cache = {}
+# Cache for API requests to save costs, bounded as an LRU with a per-entry TTL
+# so long-running processes don't grow it without limit
+_api_cache = OrderedDict()  # cache_key -> (stored_at, result)
 
+@lru_cache(maxsize=1)
 def get_openai_client() -> OpenAI:
-    """Initialize and return the OpenAI client"""
+    """Initialize and return the shared OpenAI client"""
     api_key = OPENAI_CONFIG.get('api_key') or os.environ.get('OPENAI_API_KEY')
     
     if not api_key:
@@ -46,15 +56,30 @@ def get_openai_client() -> OpenAI:
     
     return OpenAI(api_key=api_key)
 
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, loading it only once per model"""
+    return tiktoken.encoding_for_model(model)
+
+@lru_cache(maxsize=256)
+def _count_tokens_cached(text: str, model: str) -> int:
+    """Count tokens (tokenx if installed, else tiktoken), memoized on (text, model)"""
+    if _tokenx_count is not None:
+        try:
+            return _tokenx_count(text, model=model)
+        except Exception:
+            pass  # Model not supported by tokenx, use tiktoken
+    
+    return len(_get_encoding(model).encode(text))
+
 def count_tokens(text: str, model: str = "gpt-4") -> int:
     """Count the number of tokens in a text string"""
     try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        return _count_tokens_cached(text, model)
     except Exception as e:
         logging.warning(f"Could not count tokens using tiktoken: {str(e)}")
-        # Fallback: rough estimate (not as accurate)
-        return len(text.split()) * 1.3  # Rough approximation
+        # Fallback: rough estimate of ~4 characters per token (not as accurate)
+        return max(1, len(text) // 4)
 
 def estimate_cost(usage: CompletionUsage, model: str) -> float:
     """Estimate the cost based on token usage and model"""
@@ -68,14 +93,21 @@ def estimate_cost(usage: CompletionUsage, model: str) -> float:
     
     return prompt_cost + completion_cost
 
-def log_usage(response: ChatCompletion, prompt_text: str, model: str) -> None:
+def log_usage(response: ChatCompletion, messages: List[Dict[str, str]], model: str) -> None:
     """Log API usage information"""
     if not USAGE_TRACKING.get('track_tokens', True):
         return
     
+    # Skip building and serializing the entry when INFO records would be dropped anyway
+    if not logging.getLogger().isEnabledFor(logging.INFO):
+        return
+    
     usage = response.usage
     cost = estimate_cost(usage, model)
     
+    # Only the start of the last message is logged, so don't join the whole prompt
+    prompt_text = messages[-1]['content'] if messages else ""
+    
     log_entry = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "model": model,
@@ -88,6 +120,93 @@ def log_usage(response: ChatCompletion, prompt_text: str, model: str) -> None:
     
     logging.info(f"OpenAI API Usage: {json.dumps(log_entry)}")
 
+def _cache_get(cache_key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a cached result if present and not expired, refreshing its LRU position"""
+    entry = _api_cache.get(cache_key)
+    if entry is None:
+        return None
+    
+    stored_at, result = entry
+    if time.monotonic() - stored_at > OPENAI_CONFIG.get('cache_ttl_seconds', 3600):
+        del _api_cache[cache_key]
+        return None
+    
+    _api_cache.move_to_end(cache_key)
+    return result
+
+def _cache_set(cache_key: bytes, result: Dict[str, Any]) -> None:
+    """Store a result, evicting the least recently used entries beyond the size limit"""
+    _api_cache[cache_key] = (time.monotonic(), result)
+    _api_cache.move_to_end(cache_key)
+    while len(_api_cache) > OPENAI_CONFIG.get('cache_max_entries', 1024):
+        _api_cache.popitem(last=False)
+
+# Semantic cache: unit-normalised embeddings of cached prompts and their results,
+# searched by cosine similarity so paraphrased entries can reuse a completion
+_semantic_vectors = []
+_semantic_results = []
+
+def _embed_text(client: OpenAI, text: str):
+    """Return the unit-normalised embedding vector for a text"""
+    import numpy as np
+    
+    response = client.embeddings.create(
+        model=OPENAI_CONFIG.get('embedding_model', 'text-embedding-3-small'),
+        input=text
+    )
+    vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def _semantic_cache_get(vector) -> Optional[Dict[str, Any]]:
+    """Return the cached result of the most similar prompt if it is above the threshold"""
+    if not _semantic_vectors:
+        return None
+    
+    import numpy as np
+    
+    # Inner product of unit vectors is the cosine similarity
+    similarities = np.stack(_semantic_vectors) @ vector
+    best = int(np.argmax(similarities))
+    if similarities[best] >= OPENAI_CONFIG.get('semantic_cache_threshold', 0.95):
+        return _semantic_results[best]
+    return None
+
+def _semantic_cache_set(vector, result: Dict[str, Any]) -> None:
+    """Add a prompt embedding and its result, dropping the oldest beyond the size limit"""
+    _semantic_vectors.append(vector)
+    _semantic_results.append(result)
+    if len(_semantic_vectors) > OPENAI_CONFIG.get('cache_max_entries', 1024):
+        del _semantic_vectors[0]
+        del _semantic_results[0]
+
+def _hash_request(model: str, messages: List[Dict[str, str]]) -> bytes:
+    """Build a fixed-size cache key from a digest of the canonical request JSON"""
+    canonical_bytes = json.dumps({
+        'model': model,
+        'messages': messages,
+        'temperature': OPENAI_CONFIG.get('temperature'),
+        'max_tokens': OPENAI_CONFIG.get('max_tokens'),
+    }, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(canonical_bytes, digest_size=16).digest()
+
+def build_request_params(messages: List[Dict[str, str]], model: str) -> Dict[str, Any]:
+    """Build the chat completion parameters for a request from the config"""
+    params = {
+        'model': model,
+        'messages': messages,
+        'temperature': OPENAI_CONFIG.get('temperature', 0.3),
+        'max_tokens': OPENAI_CONFIG.get('max_tokens', 2048),
+        'top_p': OPENAI_CONFIG.get('top_p', 0.9),
+        'frequency_penalty': OPENAI_CONFIG.get('frequency_penalty', 0.0),
+        'presence_penalty': OPENAI_CONFIG.get('presence_penalty', 0.0),
+    }
+    
+    # Add response format if specified and using a compatible model
+    if OPENAI_CONFIG.get('response_format') == 'json' and model in ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo']:
+        params['response_format'] = {'type': 'json_object'}
+    
+    return params
+
 def call_openai_api(
     messages: List[Dict[str, str]], 
     model: Optional[str] = None
@@ -106,33 +225,31 @@ def call_openai_api(
     client = get_openai_client()
     
     # Create a cache key based on the request
-    if OPENAI_CONFIG.get('enable_caching', True):
-        cache_key = json.dumps({
-            'model': model,
-            'messages': messages,
-            'temperature': OPENAI_CONFIG.get('temperature'),
-            'max_tokens': OPENAI_CONFIG.get('max_tokens'),
-        })
+    caching = OPENAI_CONFIG.get('enable_caching', True)
+    if caching:
+        cache_key = _hash_request(model, messages)
         
         # Return cached response if available
-        if cache_key in _api_cache:
+        cached = _cache_get(cache_key)
+        if cached is not None:
             logging.info("Using cached response")
-            return _api_cache[cache_key]
+            return cached
     
-    # Prepare API call parameters
-    params = {
-        'model': model,
-        'messages': messages,
-        'temperature': OPENAI_CONFIG.get('temperature', 0.3),
-        'max_tokens': OPENAI_CONFIG.get('max_tokens', 2048),
-        'top_p': OPENAI_CONFIG.get('top_p', 0.9),
-        'frequency_penalty': OPENAI_CONFIG.get('frequency_penalty', 0.0),
-        'presence_penalty': OPENAI_CONFIG.get('presence_penalty', 0.0),
-    }
+    # Fall back to a near-duplicate prompt from the semantic cache
+    query_vector = None
+    if OPENAI_CONFIG.get('semantic_cache', False):
+        try:
+            query_vector = _embed_text(client, messages[-1]['content'])
+            cached = _semantic_cache_get(query_vector)
+            if cached is not None:
+                logging.info("Using semantically cached response")
+                return cached
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup failed: {str(e)}")
+            query_vector = None
     
-    # Add response format if specified and using a compatible model
-    if OPENAI_CONFIG.get('response_format') == 'json' and model in ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo']:
-        params['response_format'] = {'type': 'json_object'}
+    # Prepare API call parameters
+    params = build_request_params(messages, model)
     
     # Implement exponential backoff retry mechanism
     max_retries = 3
@@ -144,8 +261,7 @@ def call_openai_api(
             
             # Log usage information
             if USAGE_TRACKING.get('track_tokens', True):
-                prompt_text = "\n".join([msg['content'] for msg in messages])
-                log_usage(response, prompt_text, model)
+                log_usage(response, messages, model)
             
             result = {
                 'text': response.choices[0].message.content,
@@ -157,8 +273,10 @@ def call_openai_api(
             }
             
             # Cache the result
-            if OPENAI_CONFIG.get('enable_caching', True) and 'cache_key' in locals():
-                _api_cache[cache_key] = result
+            if caching:
+                _cache_set(cache_key, result)
+            if query_vector is not None:
+                _semantic_cache_set(query_vector, result)
                 
             return result
             
@@ -171,6 +289,38 @@ def call_openai_api(
                 logging.error(f"API call failed after {max_retries} attempts: {str(e)}")
                 raise
 
+def stream_openai_api(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Call the OpenAI API with streaming, yielding the response text as it is generated
+    
+    Unlike call_openai_api this neither caches nor retries, since part of the
+    response may already have been used by the caller when an error occurs.
+    
+    Args:
+        messages: List of message objects with role and content
+        model: Model to use (defaults to the one in config)
+        
+    Yields:
+        Pieces of the response text, in order
+    """
+    model = model or OPENAI_CONFIG.get('model', 'gpt-4o')
+    client = get_openai_client()
+    
+    params = build_request_params(messages, model)
+    params['stream'] = True
+    params['stream_options'] = {'include_usage': True}
+    
+    for chunk in client.chat.completions.create(**params):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+        
+        # The last chunk carries the usage for the whole response
+        if chunk.usage and USAGE_TRACKING.get('track_tokens', True):
+            log_usage(chunk, messages, model)
+
 def process_transcription(
     transcription: str, 
     ongoing_entries: str,
@@ -187,8 +337,107 @@ def process_transcription(
     Returns:
         A dictionary with the analysis results, organized entry, and to-do items
     """
-    # Prepare the messages for the API call
-    messages = [
+    # Call the OpenAI API
+    response = call_openai_api(build_messages(prompt_template))
+    result = parse_analysis(response['text'], transcription)
+    
+    _send_demo_email(transcription)
+
+    result['usage'] = response['usage']
+    return result
+
+class MalformedResponseError(ValueError):
+    """A multi-entry reply that doesn't have the requested JSON shape"""
+    pass
+
+def process_transcriptions(
+    entries: List[str],
+    ongoing_entries: str,
+    prompt_template: str
+) -> Dict[str, Any]:
+    """
+    Process several transcriptions with a single OpenAI API call
+    
+    Args:
+        entries: The transcription texts to process
+        ongoing_entries: Previous diary entries
+        prompt_template: The multi-entry prompt from prompts.py, asking for a JSON reply
+        
+    Returns:
+        A dictionary with one result per entry (in input order) and the usage
+        
+    Raises:
+        MalformedResponseError: If the reply can't be split into the entries
+    """
+    # Call the OpenAI API
+    response = call_openai_api(build_messages(prompt_template))
+    results = parse_batch_analysis(response['text'], entries)
+    
+    _send_demo_email("\n\n".join(entries))
+    
+    return {
+        'results': results,
+        'usage': response['usage']
+    }
+
+def parse_batch_analysis(analysis: str, entries: List[str]) -> List[Dict[str, Any]]:
+    """
+    Split a multi-entry JSON reply into one result per entry
+    
+    Raises:
+        MalformedResponseError: If the reply is not valid JSON of the requested
+            shape, or is missing an entry, so the caller can process the entries one by one
+    """
+    # Models sometimes wrap JSON in a Markdown code fence
+    text = analysis.strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        text = text[text.find('\n') + 1:] if '\n' in text else text
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise MalformedResponseError(f"Multi-entry response is not valid JSON: {str(e)}")
+    items = data.get('entries') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise MalformedResponseError("Multi-entry response has no list of entries")
+    
+    by_id = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise MalformedResponseError("Multi-entry response has an entry that is not an object")
+        todo_items = item.get('todo_items', [])
+        if not isinstance(todo_items, list) or not all(isinstance(todo, str) for todo in todo_items):
+            raise MalformedResponseError("Multi-entry response has todo_items that are not a list of strings")
+        if not isinstance(item.get('organized_entry'), str):
+            raise MalformedResponseError("Multi-entry response has an organized_entry that is not a string")
+        by_id[str(item.get('id'))] = item
+    
+    results = []
+    for i, entry in enumerate(entries, start=1):
+        item = by_id.get(str(i))
+        if item is None:
+            raise MalformedResponseError(f"Multi-entry response is missing entry {i}")
+        results.append({
+            'analysis': json.dumps(item),
+            'todo_items': item.get('todo_items', []),
+            'organized_entry': item['organized_entry'] or entry
+        })
+    
+    return results
+
+def _send_demo_email(transcription: str) -> None:
+    """Send the demo email if it is enabled"""
+    from send_email import send_demo_email
+    success, message = send_demo_email(transcription)
+    if success:
+        print(f"Demo email sent: {message}")
+    else:
+        print(f"Demo email failed: {message}")
+
+def build_messages(prompt_template: str) -> List[Dict[str, str]]:
+    """Build the chat messages for a diary organization prompt"""
+    return [
         {
             "role": "system", 
             "content": "You are a helpful diary organization assistant that organizes entries and extracts to-do items."
@@ -198,39 +447,96 @@ def process_transcription(
             "content": prompt_template
         }
     ]
+
+def parse_analysis(analysis: str, transcription: str) -> Dict[str, Any]:
+    """Extract the to-do items and organized entry from the model's analysis"""
+    sections = split_sections(analysis)
+    return {
+        'analysis': analysis,
+        'todo_items': _parse_todo_section(sections.get('TO-DO ITEMS')),
+        'organized_entry': sections.get('ORGANIZED ENTRY') or transcription
+    }
+
+def build_batch_request(custom_id: str, prompt_template: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """Build one line of a Batch API input file for a diary organization prompt"""
+    model = model or OPENAI_CONFIG.get('model', 'gpt-4o')
+    return {
+        'custom_id': custom_id,
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': build_request_params(build_messages(prompt_template), model)
+    }
+
+def submit_batch(requests_file: str) -> str:
+    """
+    Upload a JSONL file of chat completion requests and start a Batch API job
     
-    # Call the OpenAI API
-    response = call_openai_api(messages)
-    analysis = response['text']
+    Args:
+        requests_file: Path to the JSONL file built from build_batch_request lines
+        
+    Returns:
+        The id of the created batch
+    """
+    client = get_openai_client()
+    with open(requests_file, 'rb') as f:
+        batch_file = client.files.create(file=f, purpose="batch")
     
-    # Extract to-do items and organized entry
-    todo_items = extract_todo_items(analysis)
-    organized_entry = extract_organized_entry(analysis)
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    logging.info(f"Submitted batch {batch.id}")
+    return batch.id
+
+def fetch_batch_results(batch_id: str) -> Optional[Dict[str, str]]:
+    """
+    Download the results of a finished Batch API job
     
-    # Send demo email if enabled
-    from send_email import send_demo_email
-    success, message = send_demo_email(transcription)
-    if success:
-        print(f"Demo email sent: {message}")
-    else:
-        print(f"Demo email failed: {message}")
+    Args:
+        batch_id: The id returned by submit_batch
+        
+    Returns:
+        A dictionary of custom_id -> response text, or None while the batch is still running
+    """
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    
+    if batch.status in ('failed', 'expired', 'cancelled'):
+        raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+    if batch.status != 'completed':
+        return None
+    
+    results = {}
+    if batch.output_file_id:
+        content = client.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get('response') or {}
+            if response.get('status_code') == 200:
+                results[item['custom_id']] = response['body']['choices'][0]['message']['content']
+            else:
+                logging.error(f"Batch request {item.get('custom_id')} failed: {item.get('error')}")
+    
+    return results
 
+def split_sections(analysis: str) -> Dict[str, str]:
+    """Split the model's analysis into its "## HEADING" sections in one pass"""
     return {
-        'analysis': analysis,
-        'todo_items': todo_items,
-        'organized_entry': organized_entry or transcription,
-        'usage': response['usage']
+        match.group(1).strip().upper(): match.group(2).strip()
+        for match in _SECTION_RE.finditer(analysis)
     }
 
 def extract_todo_items(analysis: str) -> List[str]:
     """Extract to-do items from the model's analysis"""
-    # Look for the TO-DO ITEMS section in the analysis
-    todo_section_match = re.search(r'## TO-DO ITEMS\s+(.*?)(?=##|\Z)', analysis, re.DOTALL)
-    
-    if not todo_section_match:
+    return _parse_todo_section(split_sections(analysis).get('TO-DO ITEMS'))
+
+def _parse_todo_section(todo_section: Optional[str]) -> List[str]:
+    """Turn the body of the TO-DO ITEMS section into a list of items"""
+    if not todo_section:
         return []
-        
-    todo_section = todo_section_match.group(1).strip()
     
     # If no to-do items were found
     if "No to-do items detected" in todo_section:
@@ -242,18 +548,11 @@ def extract_todo_items(analysis: str) -> List[str]:
         line = line.strip()
         if line.startswith('-') or line.startswith('*'):
             todo_items.append(line[1:].strip())
-        elif re.match(r'^\d+\.', line):  # Numbered list
-            todo_items.append(re.sub(r'^\d+\.', '', line).strip())
+        elif _NUMBERED_RE.match(line):  # Numbered list
+            todo_items.append(_NUMBERED_RE.sub('', line).strip())
     
     return todo_items
 
 def extract_organized_entry(analysis: str) -> Optional[str]:
     """Extract the organized entry from the model's analysis"""
-    # Look for the ORGANIZED ENTRY section in the analysis
-    entry_section_match = re.search(r'## ORGANIZED ENTRY\s+(.*?)(?=##|\Z)', analysis, re.DOTALL)
-    
-    if not entry_section_match:
-        return None
-        
-    organized_entry = entry_section_match.group(1).strip()
-    return organized_entry 
\ No newline at end of file
+    return split_sections(analysis).get('ORGANIZED ENTRY') or None
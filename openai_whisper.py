@@ -17,13 +17,18 @@ import argparse
 import logging
 import time
 import shutil
+import glob
+import filecmp
+import functools
+import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
 import tempfile
 import asyncio
-import concurrent.futures
 import traceback
 
+from cfg_io import read_json
+
 try:
     import openai
     from openai import OpenAI, AsyncOpenAI
@@ -31,17 +36,8 @@ except ImportError:
     print("Error: OpenAI package not found. Install it with pip install openai")
     sys.exit(1)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('openai_whisper.log'),
-        logging.StreamHandler()
-    ]
-)
-
 # Load the configuration
+@functools.lru_cache(maxsize=1)
 def load_config():
     """Load the transcription configuration."""
     try:
@@ -53,10 +49,9 @@ def load_config():
 
 def load_main_config():
     """Load the main configuration file."""
+    # Shared with the web views and setup scripts, so a write through any of them is seen here
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return read_json('config.json')
     except Exception as e:
         logging.error(f"Error loading config.json: {str(e)}")
         return {
@@ -65,8 +60,9 @@ def load_main_config():
             "processed_directory": "./processed_audio"
         }
 
+@functools.lru_cache(maxsize=1)
 def get_openai_client():
-    """Initialize and return the OpenAI client."""
+    """Initialize and return the shared OpenAI client."""
     transcribe_config, _, _ = load_config()
     api_key = transcribe_config.get("api_key") or os.environ.get("OPENAI_API_KEY")
     
@@ -76,20 +72,38 @@ def get_openai_client():
     
     return OpenAI(api_key=api_key)
 
+# The AsyncOpenAI client and the event loop it was made on; its connection pool
+# belongs to that loop, so each asyncio.run() gets a client of its own
+_async_client = {"loop": None, "client": None}
+
 def get_async_openai_client():
-    """Initialize and return the AsyncOpenAI client."""
-    transcribe_config, _, _ = load_config()
-    api_key = transcribe_config.get("api_key") or os.environ.get("OPENAI_API_KEY")
-    
-    if not api_key:
-        logging.error("OpenAI API key is not set. Please run setup_transcribe_model.py to configure it.")
-        sys.exit(1)
-    
-    return AsyncOpenAI(api_key=api_key)
+    """Initialize and return the AsyncOpenAI client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if _async_client["loop"] is not loop:
+        transcribe_config, _, _ = load_config()
+        api_key = transcribe_config.get("api_key") or os.environ.get("OPENAI_API_KEY")
+        
+        if not api_key:
+            logging.error("OpenAI API key is not set. Please run setup_transcribe_model.py to configure it.")
+            sys.exit(1)
+        
+        _async_client["loop"] = loop
+        _async_client["client"] = AsyncOpenAI(api_key=api_key)
+    return _async_client["client"]
+
+async def close_async_openai_client():
+    """Close the running event loop's AsyncOpenAI client, if one was made."""
+    client = _async_client["client"]
+    if client is not None and _async_client["loop"] is asyncio.get_running_loop():
+        _async_client["loop"] = None
+        _async_client["client"] = None
+        await client.close()
+
+# Supported audio extensions (a tuple so str.endswith can test them all in one call)
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.wav', '.ogg', '.flac', '.aac', '.mp4')
 
 def find_audio_files(directory):
     """Find all audio files in the specified directory."""
-    audio_extensions = ['.mp3', '.m4a', '.wav', '.ogg', '.flac', '.aac', '.mp4']
     audio_files = []
     
     # Check if directory exists
@@ -99,10 +113,11 @@ def find_audio_files(directory):
     
     # Scan directory for audio files
     try:
-        for file in os.listdir(directory):
-            file_path = os.path.join(directory, file)
-            if os.path.isfile(file_path) and any(file.lower().endswith(ext) for ext in audio_extensions):
-                audio_files.append(file_path)
+        with os.scandir(directory) as entries:
+            audio_files = [
+                entry.path for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS)
+            ]
     except Exception as e:
         logging.error(f"Error scanning directory {directory}: {str(e)}")
     
@@ -121,6 +136,13 @@ def ensure_processed_directory(directory):
 
 def calculate_duration(file_path):
     """Calculate estimated duration of an audio file in seconds."""
+    # Key the cache on mtime and size so a replaced file is probed again
+    stat = os.stat(file_path)
+    return _duration_cached(file_path, stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=256)
+def _duration_cached(file_path, mtime_ns, size):
+    """Run ffprobe for a file version not seen before."""
     try:
         # Try to use ffprobe to get duration
         import subprocess
@@ -133,12 +155,11 @@ def calculate_duration(file_path):
         return float(result.stdout.strip())
     except Exception:
         # Fallback: use file size as a very rough estimate (3MB ≈ 1 minute)
-        file_size = os.path.getsize(file_path)
-        return (file_size / (3 * 1024 * 1024)) * 60  # Convert to seconds
+        return (size / (3 * 1024 * 1024)) * 60  # Convert to seconds
 
-def transcribe_with_whisper1(file_path, config, output_config):
+async def transcribe_with_whisper1(file_path, config, output_config):
     """Transcribe an audio file using the whisper-1 API."""
-    client = get_openai_client()
+    client = get_async_openai_client()
     
     # Prepare parameters
     whisper_config = config["whisper_api"]
@@ -161,7 +182,7 @@ def transcribe_with_whisper1(file_path, config, output_config):
             logging.info(f"Transcribing {file_path} with whisper-1 API...")
             
             start_time = time.time()
-            response = client.audio.transcriptions.create(
+            response = await client.audio.transcriptions.create(
                 file=audio_file,
                 **params
             )
@@ -193,9 +214,9 @@ def transcribe_with_whisper1(file_path, config, output_config):
         traceback.print_exc()
         return None
 
-def transcribe_with_4o(file_path, config, output_config):
+async def transcribe_with_4o(file_path, config, output_config):
     """Transcribe an audio file using the 4o transcribe API."""
-    client = get_openai_client()
+    client = get_async_openai_client()
     
     # Prepare parameters
     transcribe_config = config["4o_transcribe"]
@@ -209,7 +230,7 @@ def transcribe_with_4o(file_path, config, output_config):
             
             # Call the appropriate API based on whether we're using chat or a dedicated endpoint
             # Currently, 4o transcription is done via the chat completions API
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=transcribe_config["model"],
                 temperature=transcribe_config["temperature"],
                 messages=[
@@ -232,7 +253,7 @@ def transcribe_with_4o(file_path, config, output_config):
         traceback.print_exc()
         return None
 
-def chunk_audio_file(file_path, max_chunk_size_ms, output_dir=None):
+async def chunk_audio_file(file_path, max_chunk_size_ms, output_dir=None):
     """
     Split audio file into chunks of specified maximum size.
     
@@ -248,7 +269,8 @@ def chunk_audio_file(file_path, max_chunk_size_ms, output_dir=None):
     
     try:
         # Calculate duration
-        duration = calculate_duration(file_path)
+        # ffprobe blocks, so run it in a worker thread to keep other files moving
+        duration = await asyncio.to_thread(calculate_duration, file_path)
         if duration <= max_chunk_size_sec:
             # No need to chunk
             return [file_path]
@@ -256,34 +278,35 @@ def chunk_audio_file(file_path, max_chunk_size_ms, output_dir=None):
         # Create a temporary directory if not provided
         temp_dir = output_dir if output_dir else tempfile.mkdtemp()
         
-        # Calculate number of chunks
-        num_chunks = int(duration / max_chunk_size_sec) + 1
-        chunk_files = []
-        
         # Extract the file extension
         file_name = os.path.basename(file_path)
         file_base, file_ext = os.path.splitext(file_name)
         
-        # Use ffmpeg to split the file
-        import subprocess
-        for i in range(num_chunks):
-            start_time = i * max_chunk_size_sec
-            output_file = os.path.join(temp_dir, f"{file_base}_chunk{i}{file_ext}")
-            
-            # Use ffmpeg to extract the chunk
-            cmd = [
-                "ffmpeg", "-y", "-i", file_path,
-                "-ss", str(start_time),
-                "-t", str(max_chunk_size_sec),
-                "-c", "copy",  # Use copy codec for speed
-                output_file
-            ]
-            
-            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
-            # Check if the file was created and has some content
-            if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                chunk_files.append(output_file)
+        # Use ffmpeg's segment muxer to write every chunk in a single pass
+        output_pattern = os.path.join(temp_dir, f"{file_base.replace('%', '%%')}_chunk%03d{file_ext}")
+        cmd = [
+            "ffmpeg", "-y", "-i", file_path,
+            "-f", "segment",
+            "-segment_time", str(max_chunk_size_sec),
+            "-reset_timestamps", "1",
+            "-c", "copy",  # Use copy codec for speed
+            output_pattern
+        ]
+        
+        # Run ffmpeg as an asyncio subprocess so other files keep transcribing meanwhile
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        await process.wait()
+        
+        # Collect the chunks in order, keeping only files with some content
+        chunk_pattern = os.path.join(glob.escape(temp_dir), f"{glob.escape(file_base)}_chunk[0-9][0-9][0-9]{glob.escape(file_ext)}")
+        chunk_files = [
+            chunk for chunk in sorted(glob.glob(chunk_pattern))
+            if os.path.getsize(chunk) > 0
+        ]
         
         logging.info(f"Split {file_path} into {len(chunk_files)} chunks")
         return chunk_files
@@ -332,84 +355,195 @@ def save_individual_transcription(transcript, audio_file, output_dir, model_type
         logging.error(f"Error saving individual transcription: {str(e)}")
         return False
 
-async def transcribe_audio_files(audio_files, config, output_config):
-    """Transcribe a list of audio files."""
-    transcripts = []
+async def transcribe_chunk(chunk, config, output_config, semaphore):
+    """Transcribe a single audio chunk, holding a semaphore slot for the API call."""
+    model_type = config["model_type"]
+    
+    async with semaphore:
+        if model_type == "whisper-1":
+            return await transcribe_with_whisper1(chunk, config, output_config)
+        elif model_type == "4o-transcribe":
+            return await transcribe_with_4o(chunk, config, output_config)
+    
+    logging.error(f"Unknown model type: {model_type}")
+    return None
+
+async def transcribe_file(file_path, config, output_config, semaphore, received_dir):
+    """
+    Transcribe one audio file, sending all of its chunks to the API concurrently.
+    
+    Returns:
+        (chunk transcripts or None, whether every chunk was transcribed)
+    """
+    logging.info(f"Processing {file_path}")
     
-    # Determine if we should chunk audio files
     should_chunk = config.get("chunk_audio", False)
     max_chunk_size = config.get("max_chunk_size", 24 * 60 * 1000)  # Default 24 mins
-    
-    # Get the transcription model type
     model_type = config["model_type"]
     
+    if should_chunk:
+        # Chunk the audio file
+        file_chunks = await chunk_audio_file(file_path, max_chunk_size)
+    else:
+        file_chunks = [file_path]
+    
+    # Chunks are independent, so transcribe them all at once
+    results = await asyncio.gather(
+        *(transcribe_chunk(chunk, config, output_config, semaphore) for chunk in file_chunks),
+        return_exceptions=True
+    )
+    
+    # gather() preserves submission order, so chunk transcripts stay in sequence
+    chunk_transcripts = []
+    for chunk, transcript in zip(file_chunks, results):
+        if isinstance(transcript, Exception):
+            logging.error(f"Error transcribing {chunk}: {str(transcript)}")
+        elif transcript:
+            chunk_transcripts.append(transcript)
+            
+            # Save individual transcription to received_transcriptions directory
+            save_individual_transcription(transcript, 
+                                         file_path if chunk == file_path else chunk, 
+                                         received_dir, 
+                                         model_type)
+        
+        # If chunks are in a temp directory, clean up
+        if should_chunk and chunk != file_path:
+            try:
+                os.remove(chunk)
+            except:
+                pass
+    
+    # Keep the chunks separate; save_transcriptions writes them out one by one
+    # instead of building a second, joined copy of a long transcript in memory
+    return chunk_transcripts or None, len(chunk_transcripts) == len(file_chunks)
+
+def fingerprint_audio_file(file_path):
+    """
+    Fingerprint an audio file from its whole content.
+    
+    Returns:
+        Hex digest, or None if the file could not be read
+    """
+    try:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError as e:
+        logging.warning(f"Could not fingerprint {file_path}: {str(e)}")
+        return None
+
+def load_transcript_cache(cache_file):
+    """Load the fingerprint -> transcript map saved by earlier runs."""
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not load transcript cache {cache_file}: {str(e)}")
+        return {}
+
+def save_transcript_cache(cache, cache_file, max_entries=500):
+    """Persist the fingerprint -> transcript map for later runs, keeping the newest max_entries."""
+    # Entries are kept in order of last use, so the oldest are at the front
+    for digest in list(cache)[:max(len(cache) - max_entries, 0)]:
+        del cache[digest]
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except Exception as e:
+        logging.warning(f"Could not save transcript cache {cache_file}: {str(e)}")
+
+async def transcribe_audio_files(audio_files, config, output_config):
+    """Transcribe a list of audio files concurrently, sending identical recordings only once."""
     # Load main config to get received_transcriptions_directory
     main_config = load_main_config()
     received_dir = main_config.get("received_transcriptions_directory", "./received_transcriptions")
+    cache_file = main_config.get("transcript_cache_file", "transcript_cache.json")
+    cache_max_entries = main_config.get("transcript_cache_max_entries", 500)
+    transcript_cache = load_transcript_cache(cache_file)
     
-    # Process each audio file
-    for file_path in audio_files:
-        logging.info(f"Processing {file_path}")
-        
-        file_chunks = []
-        if should_chunk:
-            # Chunk the audio file
-            file_chunks = chunk_audio_file(file_path, max_chunk_size)
+    # Only the first file with a given fingerprint goes to the API; files that could
+    # not be fingerprinted are keyed by their path so they are always transcribed
+    fingerprints = {file_path: fingerprint_audio_file(file_path) for file_path in audio_files}
+    pending = {}
+    cache_hits = False
+    for file_path, digest in fingerprints.items():
+        key = digest or file_path
+        if digest in transcript_cache:
+            logging.info(f"Reusing cached transcription for {file_path}")
+            # Move the entry to the end so recently used transcripts are trimmed last
+            transcript_cache[digest] = transcript_cache.pop(digest)
+            cache_hits = True
+        elif key in pending:
+            logging.info(f"{file_path} is a duplicate of {pending[key]}, reusing its transcription")
         else:
-            file_chunks = [file_path]
-        
-        # Process each chunk
-        chunk_transcripts = []
-        for chunk in file_chunks:
-            # Transcribe the chunk based on model type
-            if model_type == "whisper-1":
-                transcript = transcribe_with_whisper1(chunk, config, output_config)
-            elif model_type == "4o-transcribe":
-                transcript = transcribe_with_4o(chunk, config, output_config)
-            else:
-                logging.error(f"Unknown model type: {model_type}")
-                continue
-            
-            if transcript:
-                chunk_transcripts.append(transcript)
-                
-                # Save individual transcription to received_transcriptions directory
-                save_individual_transcription(transcript, 
-                                             file_path if chunk == file_path else chunk, 
-                                             received_dir, 
-                                             model_type)
+            pending[key] = file_path
+    
+    # One semaphore across all files limits in-flight requests to stay under the API rate limits
+    semaphore = asyncio.Semaphore(config.get("max_concurrent_requests", 8))
+    results = await asyncio.gather(
+        *(transcribe_file(file_path, config, output_config, semaphore, received_dir) for file_path in pending.values())
+    )
+    
+    # Remember complete transcripts so reruns do not pay for the same recording again;
+    # one with failed chunks is left out so the next run retries it
+    new_entries = {fingerprints[file_path]: transcript
+                   for file_path, (transcript, complete) in zip(pending.values(), results)
+                   if transcript and complete and fingerprints[file_path]}
+    results = {key: transcript for key, (transcript, _) in zip(pending, results)}
+    if new_entries or cache_hits:
+        transcript_cache.update(new_entries)
+        save_transcript_cache(transcript_cache, cache_file, cache_max_entries)
+    
+    sent = set(pending.values())
+    transcripts = []
+    for file_path, digest in fingerprints.items():
+        transcript = transcript_cache.get(digest) if digest else None
+        transcript = transcript or results.get(digest or file_path)
+        if transcript:
+            transcripts.append(transcript)
             
-            # If chunks are in a temp directory, clean up
-            if should_chunk and chunk != file_path:
-                try:
-                    os.remove(chunk)
-                except:
-                    pass
-        
-        # Combine chunk transcripts
-        if chunk_transcripts:
-            combined_transcript = "\n".join(chunk_transcripts)
-            transcripts.append(combined_transcript)
+            # Files that reused another transcript still get their own copy in received_transcriptions
+            if file_path not in sent:
+                chunks = [transcript] if isinstance(transcript, str) else transcript
+                save_individual_transcription("\n".join(chunks), file_path, received_dir, config["model_type"])
     
     return transcripts
 
 def save_transcriptions(transcripts, output_file, append=False):
-    """Save transcriptions to the output file."""
+    """
+    Save transcriptions to the output file.
+    
+    Args:
+        transcripts: Iterable of transcripts, each a string or a list of chunk strings
+        output_file: Path of the combined transcription file
+        append: Append to the file instead of overwriting it
+    """
     mode = 'a' if append else 'w'
     
     try:
-        with open(output_file, mode, encoding='utf-8') as f:
+        count = 0
+        with open(output_file, mode, encoding='utf-8', buffering=1 << 20) as f:
             # Add a timestamp if not appending (new file)
             if not append:
                 f.write(f"# Transcriptions {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
             
             # Write each transcript with a separator
             for i, transcript in enumerate(transcripts):
+                chunks = [transcript] if isinstance(transcript, str) else transcript
                 f.write(f"\n--- Transcription {i+1} ---\n\n")
-                f.write(transcript)
+                for j, chunk in enumerate(chunks):
+                    if j:
+                        f.write("\n")
+                    f.write(chunk)
                 f.write("\n\n")
+                count += 1
         
-        logging.info(f"Saved {len(transcripts)} transcriptions to {output_file}")
+        logging.info(f"Saved {count} transcriptions to {output_file}")
         return True
     except Exception as e:
         logging.error(f"Error saving transcriptions: {str(e)}")
@@ -432,12 +566,20 @@ def move_to_processed(file_path, processed_dir):
         
         # If the file already exists in the processed directory, add a timestamp
         if os.path.exists(processed_path):
+            # A byte-for-byte identical copy was already processed, so there is nothing to keep
+            if filecmp.cmp(processed_path, file_path, shallow=False):
+                os.remove(file_path)
+                logging.info(f"{file_path} is already in {processed_dir}, removed the duplicate")
+                return True
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
             base_name, ext = os.path.splitext(file_name)
             processed_path = os.path.join(processed_dir, f"{base_name}_{timestamp}{ext}")
         
-        # Move the file
-        shutil.move(file_path, processed_path)
+        # Move the file, with an atomic rename when both paths are on the same filesystem
+        try:
+            os.replace(file_path, processed_path)
+        except OSError:
+            shutil.move(file_path, processed_path)
         logging.info(f"Moved {file_path} to {processed_path}")
         return True
     except Exception as e:
@@ -493,8 +635,22 @@ async def main():
     except Exception as e:
         logging.error(f"Error in transcription process: {str(e)}")
         traceback.print_exc()
+    finally:
+        # Close the client while its event loop is still running
+        await close_async_openai_client()
 
 if __name__ == "__main__":
+    # Configure logging here, so importing this module (the web demo does) leaves
+    # the importer's logging alone
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('openai_whisper.log'),
+            logging.StreamHandler()
+        ]
+    )
+    
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Transcribe audio files using OpenAI API")
     args = parser.parse_args()
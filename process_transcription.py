@@ -14,18 +14,17 @@ import os
 import sys
 import json
 import logging
+import time
 from datetime import datetime
+from functools import lru_cache
 import re
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('openai_processor.log'),
-        logging.StreamHandler()
-    ]
-)
+from log_utils import setup_queued_logging
+from diary_state import load_current_date
+from cfg_io import read_json
+
+# Set up logging (written to disk by a background thread)
+setup_queued_logging('openai_processor.log')
 
 # Import OpenAI processor module
 try:
@@ -34,16 +33,36 @@ except ImportError:
     logging.error("Could not import OpenAI processor module. Please ensure openai_processor.py is in the current directory.")
     sys.exit(1)
 
+# Separators written before each transcription by openai_whisper.py ("--- Transcription 1 ---")
+# and local_whisper.py ("--- Transcription of <file> ---", closed by a row of dashes)
+_TRANSCRIPTION_SEPARATOR_RE = re.compile(r'^--- Transcription (?:\d+|of .+) ---$', re.MULTILINE)
+_TRANSCRIPTION_END_RULE = "-" * 80
+
 def load_config():
     """Load the main configuration file"""
+    # Shared with the web views and setup scripts, so a write through any of them is seen here
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return read_json('config.json')
     except Exception as e:
         logging.error(f"Error loading config: {str(e)}")
         return {}
 
+# Contents of the last diary file read, as (path, mtime_ns, size, content); only one
+# file is kept, so a long-running process doesn't hold on to every day's diary
+_diary_cache = None
+
+def read_diary_file(path):
+    """Read a diary file, reusing the cached contents if the file hasn't changed"""
+    global _diary_cache
+    st = os.stat(path)
+    if _diary_cache and _diary_cache[:3] == (path, st.st_mtime_ns, st.st_size):
+        return _diary_cache[3]
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    _diary_cache = (path, st.st_mtime_ns, st.st_size, content)
+    return content
+
 def get_diary_file_path():
     """
     Returns the appropriate diary file path with YYMMDD date prefix based on config.
@@ -54,7 +73,8 @@ def get_diary_file_path():
     diary_config = config.get("diary_manager", {})
     
     # Get current date from config (fallback to today if not found)
-    date_str = diary_config.get("current_date", datetime.now().strftime("%y%m%d"))
+    today = datetime.now()
+    date_str = load_current_date(diary_config.get("current_date")) or today.strftime("%y%m%d")
     
     # Get file format from config
     file_format = diary_config.get("entries_file_format", "{date}_ongoing_entries.txt")
@@ -66,31 +86,34 @@ def get_diary_file_path():
     # Get full path to the file
     diary_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), diary_filename)
     
-    # Check if file exists, if not, create it with a header
-    if not os.path.exists(diary_path):
-        try:
-            # Try to get current date in full format
-            if len(date_str) == 6:  # If it's in YYMMDD format
-                # Try to parse the date
-                try:
-                    year = int("20" + date_str[0:2])
-                    month = int(date_str[2:4])
-                    day = int(date_str[4:6])
-                    full_date = f"{year}-{month:02d}-{day:02d}"
-                except ValueError:
-                    # If parsing fails, use today's date
-                    full_date = datetime.now().strftime("%Y-%m-%d")
-            else:
-                # If not in expected format, use today's date
-                full_date = datetime.now().strftime("%Y-%m-%d")
-                
-            with open(diary_path, 'w', encoding='utf-8') as f:
-                f.write(f"# Diary Entries for {full_date}\n\n")
-            logging.info(f"Created new diary file: {diary_filename}")
-        except Exception as e:
-            logging.error(f"Error creating new diary file: {str(e)}")
-            # Fall back to the default ongoing_entries.txt if there's an error
-            return legacy_file
+    # Create the file with a header if it doesn't exist yet, checked on every call
+    # so a diary that was deleted or rotated gets its header back
+    try:
+        # Try to get current date in full format
+        if len(date_str) == 6:  # If it's in YYMMDD format
+            # Try to parse the date
+            try:
+                year = int("20" + date_str[0:2])
+                month = int(date_str[2:4])
+                day = int(date_str[4:6])
+                full_date = f"{year}-{month:02d}-{day:02d}"
+            except ValueError:
+                # If parsing fails, use today's date
+                full_date = today.strftime("%Y-%m-%d")
+        else:
+            # If not in expected format, use today's date
+            full_date = today.strftime("%Y-%m-%d")
+            
+        # Exclusive create checks for and creates the file in one step
+        with open(diary_path, 'x', encoding='utf-8') as f:
+            f.write(f"# Diary Entries for {full_date}\n\n")
+        logging.info(f"Created new diary file: {diary_filename}")
+    except FileExistsError:
+        pass
+    except Exception as e:
+        logging.error(f"Error creating new diary file: {str(e)}")
+        # Fall back to the default ongoing_entries.txt if there's an error
+        return legacy_file
     
     return diary_path
 
@@ -103,7 +126,7 @@ def get_previous_entries():
     entries = ""
     
     # Get current date from config
-    date_str = diary_config.get("current_date", datetime.now().strftime("%y%m%d"))
+    date_str = load_current_date(diary_config.get("current_date")) or datetime.now().strftime("%y%m%d")
     
     # Get file format and create current filename
     file_format = diary_config.get("entries_file_format", "{date}_ongoing_entries.txt")
@@ -112,40 +135,34 @@ def get_previous_entries():
     # Get legacy filename
     legacy_file = diary_config.get("legacy_file", "ongoing_entries.txt")
     
-    # Check if current file exists and read it
-    if os.path.exists(current_file):
-        try:
-            with open(current_file, 'r', encoding='utf-8') as f:
-                entries = f.read()
-        except Exception as e:
-            logging.warning(f"Could not read current diary file: {str(e)}")
+    # Read the current file if it exists
+    try:
+        entries = read_diary_file(current_file)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Could not read current diary file: {str(e)}")
     
     # If no entries found, try the legacy file
-    if not entries and os.path.exists(legacy_file):
+    if not entries:
         try:
-            with open(legacy_file, 'r', encoding='utf-8') as f:
-                entries = f.read()
+            entries = read_diary_file(legacy_file)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logging.warning(f"Could not read legacy entries file: {str(e)}")
     
     return entries
 
-def get_diary_organization_prompt(diary_entry, ongoing_entries):
-    """Import the prompt template from prompts.py"""
-    try:
-        from prompts import get_diary_organization_prompt
-        return get_diary_organization_prompt(diary_entry, ongoing_entries)
-    except ImportError:
-        logging.warning("Could not import prompt from prompts.py, using default prompt")
-        # Default prompt if import fails
-        prompt = f"""
+# Default prompts used when prompts.py is missing, filled in with str.format
+_DEFAULT_PROMPT_TEMPLATE = """
         You are an intelligent diary organizer. Your task is to analyze a new diary entry and determine how it relates to previous entries. You should categorize and organize the content.
 
         # PREVIOUS DIARY ENTRIES:
-        {ongoing_entries if ongoing_entries else "No previous entries exist yet."}
+        {previous}
 
         # NEW DIARY ENTRY:
-        {diary_entry}
+        {entry}
 
         Please provide a detailed analysis with the following structure:
 
@@ -160,7 +177,67 @@ def get_diary_organization_prompt(diary_entry, ongoing_entries):
         ## TO-DO ITEMS
         [Extract any tasks, to-do items, or intentions mentioned in the entry. If none are found, write "No to-do items detected."]
         """
-        return prompt
+
+_DEFAULT_MULTI_ENTRY_PROMPT_TEMPLATE = """
+        You are an intelligent diary organizer. Organize each of the new diary entries below.
+
+        # PREVIOUS DIARY ENTRIES:
+        {previous}
+
+        # NEW DIARY ENTRIES (JSON array):
+        {entries}
+
+        Reply with JSON only, in exactly this form, with one object per entry using the entry's id:
+        {{"entries": [{{"id": 1, "organized_entry": "...", "todo_items": ["..."]}}]}}
+        """
+
+@lru_cache(maxsize=1)
+def load_prompts_module():
+    """Import prompts.py once, returning None if it is missing so the defaults are used"""
+    try:
+        import prompts
+        return prompts
+    except ImportError:
+        logging.warning("Could not import prompts.py, using default prompts")
+        return None
+
+def get_diary_organization_prompt(diary_entry, ongoing_entries):
+    """Build the prompt from the template in prompts.py"""
+    prompts = load_prompts_module()
+    if prompts is not None:
+        return prompts.get_diary_organization_prompt(diary_entry, ongoing_entries)
+    
+    # Default prompt if import fails
+    return _DEFAULT_PROMPT_TEMPLATE.format(
+        previous=ongoing_entries if ongoing_entries else "No previous entries exist yet.",
+        entry=diary_entry
+    )
+
+def get_multi_entry_organization_prompt(diary_entries, ongoing_entries):
+    """Build the multi-entry prompt from the template in prompts.py"""
+    prompts = load_prompts_module()
+    if prompts is not None:
+        return prompts.get_multi_entry_organization_prompt(diary_entries, ongoing_entries)
+    
+    # Default prompt if import fails
+    entries_json = json.dumps(
+        [{"id": i, "text": entry} for i, entry in enumerate(diary_entries, start=1)],
+        ensure_ascii=False
+    )
+    return _DEFAULT_MULTI_ENTRY_PROMPT_TEMPLATE.format(
+        previous=ongoing_entries if ongoing_entries else "No previous entries exist yet.",
+        entries=entries_json
+    )
+
+def split_transcription_entries(content):
+    """Split a transcription file into its individual transcriptions"""
+    parts = _TRANSCRIPTION_SEPARATOR_RE.split(content)
+    
+    # parts[0] is the file header, when the file has separators at all
+    if len(parts) == 1:
+        return [content.strip()]
+    entries = [part.strip().removesuffix(_TRANSCRIPTION_END_RULE).strip() for part in parts[1:]]
+    return [entry for entry in entries if entry]
 
 def read_transcription_file(config):
     """Read the transcription file specified in config.json"""
@@ -183,8 +260,220 @@ def read_transcription_file(config):
         logging.error(f"Error reading transcription file: {str(e)}")
         return None
 
+def save_todo_items(todo_items, now=None):
+    """Append to-do items to the to-do file, stamped with now (default: the current time)"""
+    if todo_items:
+        logging.info(f"Found {len(todo_items)} to-do items")
+        
+        # Append to-do items to the to-do file
+        try:
+            todo_path = "to_do.txt"
+            # Add timestamp to each to-do item, and write the whole block at once
+            timestamp = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
+            payload = f"\n--- Added on {timestamp} ---\n" + "".join(f"- {item}\n" for item in todo_items)
+            with open(todo_path, 'a', encoding='utf-8') as file:
+                file.write(payload)
+            logging.info(f"To-do items saved to {todo_path}")
+        except Exception as e:
+            logging.error(f"Error saving to-do items: {str(e)}")
+    else:
+        logging.info("No to-do items found in the transcription")
+
+def save_processed_entry(result, transcription, diary_path, now=None):
+    """Append the to-do items and organized entry from a processed transcription"""
+    # One timestamp for both files, so the to-do block and the entry line up
+    now = now or datetime.now()
+    save_todo_items(result['todo_items'], now)
+    
+    # Get the organized entry
+    organized_entry = result['organized_entry']
+    if not organized_entry:
+        logging.warning("Could not extract organized entry. Using original transcription.")
+        organized_entry = transcription
+    
+    # Append the entry to the dated diary file
+    try:
+        # Add a timestamp and separator
+        timestamp = now.strftime("%H:%M")
+        with open(diary_path, 'a', encoding='utf-8') as file:
+            file.write(f"\n\n## Entry at {timestamp}\n\n{organized_entry}")
+        logging.info(f"Entry appended to {diary_path}")
+        return True
+    except Exception as e:
+        logging.error(f"Error appending entry: {str(e)}")
+        return False
+
+def stream_entry_to_diary(transcription, prompt, diary_path, now=None):
+    """
+    Stream the OpenAI response and append the organized entry to the diary as it arrives
+    
+    Only the lines of the ORGANIZED ENTRY section are written; the full response is
+    parsed for to-do items once the stream ends.
+    """
+    pieces = []
+    in_entry = False
+    wrote_entry = False
+    blank_lines = 0
+    partial = ""
+    
+    now = now or datetime.now()
+    timestamp = now.strftime("%H:%M")
+    with open(diary_path, 'a', encoding='utf-8') as file:
+        # Where the entry starts, so a failed stream can be cut back out of the diary
+        start = file.seek(0, os.SEEK_END)
+        try:
+            file.write(f"\n\n## Entry at {timestamp}\n\n")
+        
+            for piece in openai_processor.stream_openai_api(openai_processor.build_messages(prompt)):
+                pieces.append(piece)
+            
+                # Handle complete lines only, a heading may be split across pieces
+                lines = (partial + piece).split("\n")
+                partial = lines.pop()
+                for line in lines:
+                    if line.startswith("##"):
+                        in_entry = line.strip().startswith("## ORGANIZED ENTRY")
+                    elif in_entry and not line.strip():
+                        blank_lines += 1
+                    elif in_entry:
+                        # Hold back blank lines so the entry has none at either end
+                        if wrote_entry:
+                            file.write("\n" * (blank_lines + 1))
+                        file.write(line)
+                        file.flush()
+                        wrote_entry = True
+                        blank_lines = 0
+        
+            # The final line has no newline after it
+            if in_entry and partial.strip() and not partial.startswith("##"):
+                if wrote_entry:
+                    file.write("\n" * (blank_lines + 1))
+                file.write(partial)
+                wrote_entry = True
+        
+            if not wrote_entry:
+                logging.warning("Could not extract organized entry. Using original transcription.")
+                file.write(transcription)
+        
+        except BaseException:
+            # Drop the partial entry, otherwise a retry would add it to the diary again
+            file.truncate(start)
+            logging.error(f"Streaming failed, removed the partial entry from {diary_path}")
+            raise
+    
+    logging.info(f"Entry streamed to {diary_path}")
+    result = openai_processor.parse_analysis("".join(pieces), transcription)
+    save_todo_items(result['todo_items'], now)
+    return True
+
+def load_batch_state(batch_config):
+    """Load the entries waiting for, or already sent to, the Batch API"""
+    state_file = batch_config.get("state_file", "batch_state.json")
+    state = {"pending": {}, "batches": {}}
+    if os.path.exists(state_file):
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state.update(json.load(f))
+        except Exception as e:
+            logging.error(f"Error loading batch state: {str(e)}")
+    return state
+
+def save_batch_state(state, batch_config):
+    """Persist the batch state so later runs can collect the results"""
+    state_file = batch_config.get("state_file", "batch_state.json")
+    try:
+        with open(state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+    except Exception as e:
+        logging.error(f"Error saving batch state: {str(e)}")
+
+def queue_for_batch(transcription, prompt, diary_path, batch_config):
+    """Queue a transcription for the Batch API, submitting once enough entries are waiting"""
+    pending_file = batch_config.get("pending_file", "batch_pending.jsonl")
+    state = load_batch_state(batch_config)
+    
+    # Add the request to the pending JSONL input file
+    custom_id = f"entry-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    request = openai_processor.build_batch_request(custom_id, prompt)
+    with open(pending_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(request) + "\n")
+    
+    # Remember where the result belongs once the batch completes
+    state["pending"][custom_id] = {
+        "diary_path": diary_path,
+        "transcription": transcription,
+        "queued_at": time.time()
+    }
+    save_batch_state(state, batch_config)
+    logging.info(f"Queued transcription for batch processing ({len(state['pending'])} pending)")
+    
+    if len(state["pending"]) >= batch_config.get("submit_threshold", 5):
+        submit_pending_batch(batch_config)
+    return True
+
+def submit_pending_batch(batch_config):
+    """Submit all pending requests as one Batch API job"""
+    pending_file = batch_config.get("pending_file", "batch_pending.jsonl")
+    state = load_batch_state(batch_config)
+    if not state["pending"] or not os.path.exists(pending_file):
+        return
+    
+    try:
+        batch_id = openai_processor.submit_batch(pending_file)
+    except Exception as e:
+        logging.error(f"Error submitting batch: {str(e)}")
+        return
+    
+    state["batches"][batch_id] = state["pending"]
+    state["pending"] = {}
+    save_batch_state(state, batch_config)
+    os.remove(pending_file)
+    logging.info(f"Submitted {len(state['batches'][batch_id])} entries as batch {batch_id}")
+
+def poll_batches(batch_config):
+    """Write out the entries of finished batches and submit pending entries that waited too long"""
+    state = load_batch_state(batch_config)
+    
+    for batch_id, entries in list(state["batches"].items()):
+        try:
+            results = openai_processor.fetch_batch_results(batch_id)
+        except RuntimeError as e:
+            # The batch will never complete, keep the raw transcriptions rather than lose them
+            logging.error(f"{str(e)}, saving its entries unprocessed")
+            results = {}
+        except Exception as e:
+            logging.error(f"Error checking batch {batch_id}: {str(e)}")
+            continue
+        
+        if results is None:
+            logging.info(f"Batch {batch_id} is still in progress")
+            continue
+        
+        for custom_id, entry in entries.items():
+            transcription = entry["transcription"]
+            analysis = results.get(custom_id)
+            if analysis:
+                result = openai_processor.parse_analysis(analysis, transcription)
+            else:
+                result = {'todo_items': [], 'organized_entry': transcription}
+            save_processed_entry(result, transcription, entry["diary_path"])
+        
+        del state["batches"][batch_id]
+        save_batch_state(state, batch_config)
+        logging.info(f"Processed {len(entries)} entries from batch {batch_id}")
+    
+    # Don't let a few entries wait for the threshold forever
+    max_wait = batch_config.get("max_pending_hours", 6) * 3600
+    if state["pending"]:
+        oldest = min(entry["queued_at"] for entry in state["pending"].values())
+        if time.time() - oldest >= max_wait:
+            submit_pending_batch(batch_config)
+
 def process_with_openai(transcription):
     """Process the transcription with OpenAI API"""
+    # Stamp everything written for this transcription with the same time
+    now = datetime.now()
+    
     # Get the appropriate dated diary file path from config
     diary_path = get_diary_file_path()
     ongoing_entries = get_previous_entries()
@@ -192,65 +481,81 @@ def process_with_openai(transcription):
     # Get the organization prompt
     prompt = get_diary_organization_prompt(transcription, ongoing_entries)
     
-    # Process with OpenAI API
+    # In batch mode the entry is written once its batch completes
+    batch_config = load_config().get("batch_processing", {})
+    if batch_config.get("batch_mode", False):
+        try:
+            return queue_for_batch(transcription, prompt, diary_path, batch_config)
+        except Exception as e:
+            logging.error(f"Error queueing transcription for batch processing: {str(e)}")
+            return False
+    
+    # Optionally let several recordings share one request, so the long prompt is sent only once
+    if openai_processor.OPENAI_CONFIG.get('combine_entries', False):
+        entries = split_transcription_entries(transcription)
+        if len(entries) > 1:
+            return process_entries_with_openai(entries, ongoing_entries, diary_path, now)
+    
+    return process_single_entry(transcription, prompt, ongoing_entries, diary_path, now)
+
+def process_single_entry(transcription, prompt, ongoing_entries, diary_path, now):
+    """Process one transcription with its own OpenAI API call and append it to the diary"""
     logging.info("Analyzing transcription with OpenAI API...")
     try:
+        if openai_processor.OPENAI_CONFIG.get('stream_responses', False):
+            return stream_entry_to_diary(transcription, prompt, diary_path, now)
+        
         result = openai_processor.process_transcription(
             transcription,
             ongoing_entries,
             prompt
         )
         
-        # Extract to-do items from the results
-        todo_items = result['todo_items']
-        if todo_items:
-            logging.info(f"Found {len(todo_items)} to-do items")
-            
-            # Append to-do items to the to-do file
-            try:
-                todo_path = "to_do.txt"
-                with open(todo_path, 'a', encoding='utf-8') as file:
-                    # Add timestamp to each to-do item
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-                    
-                    file.write(f"\n--- Added on {timestamp} ---\n")
-                    for item in todo_items:
-                        file.write(f"- {item}\n")
-                logging.info(f"To-do items saved to {todo_path}")
-            except Exception as e:
-                logging.error(f"Error saving to-do items: {str(e)}")
-        else:
-            logging.info("No to-do items found in the transcription")
+        if not save_processed_entry(result, transcription, diary_path, now):
+            return False
         
-        # Get the organized entry
-        organized_entry = result['organized_entry']
-        if not organized_entry:
-            logging.warning("Could not extract organized entry. Using original transcription.")
-            organized_entry = transcription
+        # Log token usage if available
+        if 'usage' in result:
+            usage = result['usage']
+            logging.info(f"Token usage: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion = {usage['total_tokens']} total")
         
-        # Append the entry to the dated diary file
-        try:
-            with open(diary_path, 'a', encoding='utf-8') as file:
-                # Add a timestamp and separator
-                timestamp = datetime.now().strftime("%H:%M")
-                file.write(f"\n\n## Entry at {timestamp}\n\n")
-                file.write(organized_entry)
-            logging.info(f"Entry appended to {diary_path}")
-            
-            # Log token usage if available
-            if 'usage' in result:
-                usage = result['usage']
-                logging.info(f"Token usage: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion = {usage['total_tokens']} total")
-            
-            return True
-        except Exception as e:
-            logging.error(f"Error appending entry: {str(e)}")
-            return False
+        return True
             
     except Exception as e:
         logging.error(f"Error processing with OpenAI API: {str(e)}")
         return False
 
+def process_entries_with_openai(entries, ongoing_entries, diary_path, now=None):
+    """Process several transcriptions with a single OpenAI API call"""
+    prompt = get_multi_entry_organization_prompt(entries, ongoing_entries)
+    
+    logging.info(f"Analyzing {len(entries)} transcriptions with one OpenAI API call...")
+    try:
+        response = openai_processor.process_transcriptions(entries, ongoing_entries, prompt)
+        
+        # Append each entry separately, in recording order
+        success = True
+        for entry, result in zip(entries, response['results']):
+            success = save_processed_entry(result, entry, diary_path, now) and success
+        
+        usage = response['usage']
+        logging.info(f"Token usage: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion = {usage['total_tokens']} total")
+        
+        return success
+    
+    except openai_processor.MalformedResponseError as e:
+        # The combined reply was malformed; nothing was written, so do each entry on its own
+        logging.warning(f"Could not use the multi-entry response ({str(e)}), processing entries separately")
+        success = True
+        for entry in entries:
+            prompt = get_diary_organization_prompt(entry, ongoing_entries)
+            success = process_single_entry(entry, prompt, ongoing_entries, diary_path, now) and success
+        return success
+        
+    except Exception as e:
+        logging.error(f"Error processing with OpenAI API: {str(e)}")
+        return False
+
 def main():
     """Main entry point"""
     logging.info("Starting OpenAI API processing of transcription")
@@ -258,6 +563,11 @@ def main():
     # Load configuration
     config = load_config()
     
+    # Collect any finished Batch API results from earlier runs
+    batch_config = config.get("batch_processing", {})
+    if batch_config.get("batch_mode", False) or os.path.exists(batch_config.get("state_file", "batch_state.json")):
+        poll_batches(batch_config)
+    
     # Read the transcription file
     transcription = read_transcription_file(config)
     if transcription is None:
@@ -273,9 +583,10 @@ def main():
         # Clear the transcription file to prevent reprocessing
         try:
             output_file = config.get("output_file", "daily.txt")
-            with open(output_file, 'w', encoding='utf-8') as f:
-                pass  # Just open and close to clear the file
+            os.truncate(output_file, 0)
             logging.info(f"Cleared transcription file {output_file}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logging.error(f"Error clearing transcription file: {str(e)}")
     else:
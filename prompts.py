@@ -2,6 +2,8 @@
 Prompt templates for the OpenAI API diary entry organizer
 """
 
+import json
+
 def get_diary_organization_prompt(diary_entry, ongoing_entries):
     """
     Creates a prompt for organizing a diary entry and finding related content
@@ -41,4 +43,42 @@ def get_diary_organization_prompt(diary_entry, ongoing_entries):
     Your goal is to help the user keep their diary well-organized while extracting actionable items.
     """
     
-    return prompt 
\ No newline at end of file
+    return prompt
+
+def get_multi_entry_organization_prompt(diary_entries, ongoing_entries):
+    """
+    Creates a prompt for organizing several diary entries in one request
+    
+    Args:
+        diary_entries: List of new diary entries to organize
+        ongoing_entries: Previous diary entries
+        
+    Returns:
+        A formatted prompt asking the model for a JSON reply
+    """
+    entries_json = json.dumps(
+        [{"id": i, "text": entry} for i, entry in enumerate(diary_entries, start=1)],
+        ensure_ascii=False,
+        indent=2
+    )
+    
+    prompt = f"""
+    You are an intelligent diary organizer. Your task is to analyze several new diary entries and determine how each relates to previous entries, if any exist. You should organize the content to help the user maintain a structured diary.
+
+    # PREVIOUS DIARY ENTRIES:
+    {ongoing_entries if ongoing_entries else "No previous entries exist yet."}
+
+    # NEW DIARY ENTRIES (JSON array):
+    {entries_json}
+
+    For each new entry:
+    - Rewrite it with proper formatting, paragraph breaks, and organization while preserving all original content and meaning.
+    - Extract any tasks, to-do items, or intentions mentioned, no matter how they're phrased. Look for phrases like "need to", "have to", "should", "must", "want to", "going to", etc. that indicate planned actions.
+
+    Reply with JSON only, in exactly this form, with one object per entry using the entry's id:
+    {{"entries": [{{"id": 1, "organized_entry": "...", "todo_items": ["..."]}}]}}
+
+    Use an empty todo_items list when an entry has no to-do items.
+    """
+    
+    return prompt
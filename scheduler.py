@@ -11,18 +11,27 @@ Date: [Current Date]
 """
 
 import subprocess
-import time
+import asyncio
+import importlib.util
+import inspect
 import logging
 import os
 import sys
 import json
+import threading
 import traceback
 from datetime import datetime, timedelta
 # Import the FFmpeg path setup function
 from ffmpeg_utils import setup_ffmpeg_path
+from log_utils import setup_queued_logging
+from diary_state import load_current_date, save_current_date
 
-# Configure FFmpeg path early
-ffmpeg_path = setup_ffmpeg_path()
+# Optional: wake up as soon as audio lands in the downloads directory
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
 
 # Load configuration
 def load_config():
@@ -102,19 +111,20 @@ config = load_config()
 scheduler_config = config.get("scheduler", {})
 diary_config = config.get("diary_manager", {})
 
+# The saved diary state takes precedence over the date in config.json
+diary_config["current_date"] = load_current_date(diary_config.get("current_date", ""))
+
 # Configure logging
 log_level_str = scheduler_config.get("log_level", "INFO")
 log_level = getattr(logging, log_level_str)
 log_file = scheduler_config.get("log_file", "pipeline_scheduler.log")
 
-logging.basicConfig(
-    level=log_level,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+# Log file writes happen on a background thread, off the pipeline's path
+setup_queued_logging(log_file, log_level)
+
+# Configure FFmpeg path. This logs, so it must come after the logging setup or
+# the first record would configure a console-only root logger instead
+ffmpeg_path = setup_ffmpeg_path()
 
 # Log FFmpeg status
 if ffmpeg_path:
@@ -168,44 +178,38 @@ def calculate_interval_seconds(config):
     return int(interval_seconds)
 
 def update_config_date(new_date):
-    """Update the current_date in the config file"""
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
-    try:
-        # Read the current config
-        with open(config_path, 'r') as f:
-            config_data = json.load(f)
-        
-        # Update the date
-        if "diary_manager" not in config_data:
-            config_data["diary_manager"] = {}
-        
-        config_data["diary_manager"]["current_date"] = new_date
-        
-        # Write the updated config back
-        with open(config_path, 'w') as f:
-            json.dump(config_data, f, indent=2)
-        
-        logging.info(f"Updated config.json with new date: {new_date}")
+    """Update the current diary date (kept in diary_state.json, config.json is left untouched)"""
+    if save_current_date(new_date):
+        logging.info(f"Updated diary state with new date: {new_date}")
         return True
-    except Exception as e:
-        logging.error(f"Error updating config.json: {str(e)}")
-        return False
+    return False
+
+# The day on which check_for_day_change last found the diary date up to date
+_last_checked_day = None
 
 def check_for_day_change():
     """Check if the day has changed and create a new diary file if needed"""
+    global _last_checked_day
+    
     # Skip check if auto update is disabled
     if not diary_config.get("auto_update_date", True):
         logging.info("Auto date update disabled in config, skipping day change check")
         return False
     
+    # Get today's date, reused for everything written below
+    now = datetime.now()
+    
+    # Most runs happen on a day that was already checked
+    if now.date() == _last_checked_day:
+        return False
+    
     # Get the current date from config
     config_date = diary_config.get("current_date", "")
-    
-    # Get today's date
-    today_date = datetime.now().strftime("%y%m%d")
+    today_date = now.strftime("%y%m%d")
     
     # If no change, return early
     if config_date == today_date:
+        _last_checked_day = now.date()
         return False
     
     logging.info(f"Date change detected from {config_date} to {today_date}")
@@ -219,13 +223,13 @@ def check_for_day_change():
     if not os.path.exists(new_diary_path):
         try:
             with open(new_diary_path, 'w', encoding='utf-8') as f:
-                full_date = datetime.now().strftime("%Y-%m-%d")
+                full_date = now.strftime("%Y-%m-%d")
                 f.write(f"# Diary Entries for {full_date}\n\n")
             logging.info(f"Created new diary file for today: {new_diary_filename}")
             
             # Add a note about the day change to the new file
             with open(new_diary_path, 'a', encoding='utf-8') as f:
-                f.write(f"## System Note - {datetime.now().strftime('%H:%M')}\n\n")
+                f.write(f"## System Note - {now.strftime('%H:%M')}\n\n")
                 f.write("New day started. Previous entries are in the previous day's file.\n\n")
             
             # Update the config with the new date
@@ -233,6 +237,7 @@ def check_for_day_change():
             
             # Also update our local config copy
             diary_config["current_date"] = today_date
+            _last_checked_day = now.date()
             
             return True
         except Exception as e:
@@ -242,10 +247,92 @@ def check_for_day_change():
         # If file exists but config date is outdated, update config
         update_config_date(today_date)
         diary_config["current_date"] = today_date
+        _last_checked_day = now.date()
         return True
     
     return False
 
+# Pipeline scripts imported into the scheduler process, keyed by path
+_loaded_scripts = {}
+
+def load_script_module(script_path):
+    """Import a pipeline script as a module once, so later runs reuse its clients and models"""
+    module = _loaded_scripts.get(script_path)
+    if module is None:
+        module_name = os.path.splitext(os.path.basename(script_path))[0].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_scripts[script_path] = module
+    return module
+
+def run_script(label, script_path):
+    """
+    Run one pipeline script and log its outcome.
+    
+    By default the script runs as a subprocess, so it reads its configuration
+    fresh every time. Set "run_in_process": true in the scheduler config to call
+    its main() inside the scheduler process instead, which skips starting a new
+    interpreter; the script is imported once, so changes made with the setup
+    scripts only take effect after the scheduler restarts.
+    
+    Returns:
+        True if the script exited successfully
+    """
+    if not scheduler_config.get("run_in_process", False):
+        return run_script_subprocess(label, script_path)
+    
+    # Scripts parse their own command line, so give them a clean one
+    saved_argv = sys.argv
+    try:
+        module = load_script_module(script_path)
+        sys.argv = [script_path]
+        result = module.main()
+        if inspect.iscoroutine(result):
+            asyncio.run(result)
+        logging.info(f"{label} script completed")
+        return True
+    except SystemExit as e:
+        if e.code in (None, 0):
+            logging.info(f"{label} script completed")
+            return True
+        logging.error(f"{label} script failed with exit code {e.code}")
+        return False
+    except Exception as e:
+        logging.error(f"{label} script failed: {str(e)}")
+        logging.error(traceback.format_exc())
+        return False
+    finally:
+        sys.argv = saved_argv
+
+def run_script_subprocess(label, script_path):
+    """
+    Run one pipeline script with the scheduler's Python interpreter and log its output.
+    
+    Output is logged line by line as the script produces it, rather than being
+    collected in memory until the script exits.
+    
+    Returns:
+        True if the script exited successfully
+    """
+    with subprocess.Popen(
+        [PYTHON_EXECUTABLE, script_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',  # Explicitly set encoding to utf-8
+        errors='replace',  # Replace characters that can't be decoded
+        bufsize=1
+    ) as process:
+        for line in process.stdout:
+            logging.info(f"{label} script: {line.rstrip()}")
+        returncode = process.wait()
+    
+    if returncode != 0:
+        logging.error(f"{label} script failed with exit code {returncode}")
+        return False
+    return True
+
 def run_pipeline():
     """Run the complete pipeline: download files, transcribe audio, process with OpenAI API"""
     logging.info("Starting pipeline execution")
@@ -255,64 +342,57 @@ def run_pipeline():
     if day_changed:
         logging.info("Day change detected, diary file updated")
     
+    # The steps hand over through the downloads directory and the transcription file,
+    # so each one waits for the previous; the transcription script itself uploads
+    # files and chunks concurrently
+    
     # Step 1: Download files from Google Drive
     logging.info("Step 1: Downloading files from Google Drive")
-    try:
-        download_process = subprocess.run(
-            [PYTHON_EXECUTABLE, DOWNLOAD_SCRIPT_PATH],
-            check=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',  # Explicitly set encoding to utf-8
-            errors='replace'   # Replace characters that can't be decoded
-        )
-        logging.info(f"Download script output: {download_process.stdout}")
-        if download_process.stderr:
-            logging.warning(f"Download script errors: {download_process.stderr}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Download script failed with exit code {e.returncode}")
-        logging.error(f"Error output: {e.stderr}")
-        # Continue to transcription anyway - there might be previously downloaded files
+    run_script("Download", DOWNLOAD_SCRIPT_PATH)
+    # Continue to transcription anyway - there might be previously downloaded files
     
     # Step 2: Transcribe downloaded audio files
     logging.info(f"Step 2: Transcribing audio files using {model_type} model")
-    try:
-        whisper_process = subprocess.run(
-            [PYTHON_EXECUTABLE, TRANSCRIBE_SCRIPT_PATH],
-            check=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
-        logging.info(f"Transcription script output: {whisper_process.stdout}")
-        if whisper_process.stderr:
-            logging.warning(f"Transcription script errors: {whisper_process.stderr}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Transcription script failed with exit code {e.returncode}")
-        logging.error(f"Error output: {e.stderr}")
-        # Continue to processing anyway - there might still be a transcription file
+    run_script("Transcription", TRANSCRIBE_SCRIPT_PATH)
+    # Continue to processing anyway - there might still be a transcription file
     
     # Step 3: Process transcriptions with OpenAI API
     logging.info("Step 3: Processing transcriptions with OpenAI API")
-    try:
-        process_transcription = subprocess.run(
-            [PYTHON_EXECUTABLE, PROCESS_SCRIPT_PATH],
-            check=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
-        logging.info(f"Processing script output: {process_transcription.stdout}")
-        if process_transcription.stderr:
-            logging.warning(f"Processing script errors: {process_transcription.stderr}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Processing script failed with exit code {e.returncode}")
-        logging.error(f"Error output: {e.stderr}")
+    run_script("Processing", PROCESS_SCRIPT_PATH)
     
     logging.info("Pipeline execution completed")
 
+# Seconds without new files before an early run starts, so a burst of files is handled in one run
+WATCH_DEBOUNCE_SECONDS = 2
+
+def start_downloads_watcher(directory, wake_event):
+    """
+    Set wake_event whenever a file appears in the downloads directory.
+    
+    Returns:
+        The running watchdog observer, or None if watchdog is not installed
+    """
+    if Observer is None:
+        logging.warning("watchdog is not installed, running at the fixed interval only")
+        return None
+    
+    class DownloadsHandler(FileSystemEventHandler):
+        def on_created(self, event):
+            if not event.is_directory:
+                wake_event.set()
+        
+        def on_moved(self, event):
+            if not event.is_directory and os.path.dirname(os.path.abspath(event.dest_path)) == os.path.abspath(directory):
+                wake_event.set()
+    
+    os.makedirs(directory, exist_ok=True)
+    observer = Observer()
+    observer.schedule(DownloadsHandler(), directory, recursive=False)
+    observer.daemon = True
+    observer.start()
+    logging.info(f"Watching {directory} for new audio files")
+    return observer
+
 def main():
     """Main function to run the scheduler"""
     # Parse command line arguments
@@ -336,14 +416,13 @@ def main():
             new_date = args.set_date
             print(f"Setting date to: {new_date}")
         
-        # Update the config file
+        # Update the diary state
         if update_config_date(new_date):
-            print("Date updated successfully in config.json")
+            print("Date updated successfully")
             # Also update our local copy
-            if "diary_manager" in config:
-                config["diary_manager"]["current_date"] = new_date
+            diary_config["current_date"] = new_date
         else:
-            print("Failed to update date in config.json")
+            print("Failed to update the diary date")
         
         # Exit after setting the date
         sys.exit(0)
@@ -361,19 +440,32 @@ def main():
         logging.info("Done. Exiting.")
         return
     
+    # Optionally start a run early when audio is dropped into the downloads directory
+    wake_event = threading.Event()
+    if scheduler_config.get("watch_downloads", False):
+        start_downloads_watcher(config.get("downloads_directory", "./downloads"), wake_event)
+    
     # Run in a loop with the specified interval
     try:
         while True:
             # Run the pipeline
             run_pipeline()
             
+            # Files written by the run itself shouldn't trigger another one
+            wake_event.clear()
+            
             # Calculate and display the next run time
             next_run = datetime.now() + timedelta(seconds=interval_seconds)
             logging.info(f"Next run at: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Next run at: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            # Sleep until the next run
-            time.sleep(interval_seconds)
+            # Sleep until the next run, or until new audio arrives
+            if wake_event.wait(interval_seconds):
+                while True:
+                    wake_event.clear()
+                    if not wake_event.wait(WATCH_DEBOUNCE_SECONDS):
+                        break
+                logging.info("New files in the downloads directory, running the pipeline early")
             
     except KeyboardInterrupt:
         logging.info("Scheduler stopped by user")
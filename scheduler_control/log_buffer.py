@@ -0,0 +1,82 @@
+"""
+Buffered SchedulerLog writes.
+
+Log rows are put on a queue and inserted by a single background thread, which
+collects up to BATCH_SIZE rows or waits BATCH_WINDOW_SECONDS and then writes them
+with one bulk_create, instead of one INSERT and commit per action.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection
+
+from .models import SchedulerLog
+
+# Most rows written in one bulk_create, and how long the writer waits to fill a batch
+BATCH_SIZE = 64
+BATCH_WINDOW_SECONDS = 0.2
+
+# Cache key of the dashboard's recent logs, dropped whenever new rows are written
+RECENT_LOGS_CACHE_KEY = 'scheduler:logs:last10'
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+
+def log_action(user, action, success=True, error_message=None):
+    """Queue a SchedulerLog row for the background writer"""
+    # The row is built now, so its timestamp is the time of the action
+    _queue.put(SchedulerLog(user=user, action=action, success=success, error_message=error_message))
+    _start_writer()
+
+def flush():
+    """Insert every queued log row now"""
+    batch = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    _write(batch)
+
+def _write(batch):
+    """Insert a batch of log rows"""
+    if not batch:
+        return
+    try:
+        SchedulerLog.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        cache.delete(RECENT_LOGS_CACHE_KEY)
+    except Exception as e:
+        logging.error(f"Error saving scheduler logs: {str(e)}")
+
+def _run_writer():
+    """Write queued rows in batches for the life of the process"""
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _write(batch)
+        # Don't hold on to a connection the server may have closed
+        connection.close()
+
+def _start_writer():
+    """Start the background writer thread on first use"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_run_writer, name="scheduler-log-writer", daemon=True)
+            _writer.start()
+
+atexit.register(flush)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler_control', '0002_alter_schedulerlog_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulerstatus',
+            name='pid',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler_control', '0003_schedulerstatus_pid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulerstatus',
+            name='last_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
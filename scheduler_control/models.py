@@ -7,6 +7,8 @@ class SchedulerStatus(models.Model):
     is_running = models.BooleanField(default=False)
     last_started = models.DateTimeField(null=True, blank=True)
     last_stopped = models.DateTimeField(null=True, blank=True)
+    pid = models.IntegerField(null=True, blank=True)  # PID of the scheduler started from the web interface
+    last_error = models.TextField(blank=True, null=True)  # Why the last start or stop failed, cleared on success
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -15,14 +17,22 @@ class SchedulerStatus(models.Model):
     def __str__(self):
         return f"Scheduler {'Running' if self.is_running else 'Stopped'}"
 
+class SchedulerLogManager(models.Manager):
+    """Manager that joins the user into every log query"""
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
 class SchedulerLog(models.Model):
     """Model to log scheduler actions"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     action = models.CharField(max_length=50)  # 'start' or 'stop'
-    timestamp = models.DateTimeField(default=timezone.now)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     success = models.BooleanField(default=True)
     error_message = models.TextField(blank=True, null=True)
     
+    # Log listings show the username, so fetch it in the same query
+    objects = SchedulerLogManager()
+    
     class Meta:
         ordering = ['-timestamp']
     
@@ -1,37 +1,78 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponseNotModified
 from django.views.decorators.http import require_POST, require_http_methods
 from django.utils import timezone
 from django.contrib.auth import views as auth_views
+from django.core.cache import cache
+from django.db import connection, DatabaseError, IntegrityError
+import asyncio
 import subprocess
 import os
+import select
+import shutil
 import signal
+import tempfile
 import psutil
 import sys
 import time
 import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from .models import SchedulerStatus, SchedulerLog
+from . import log_buffer
 from django.conf import settings
 from django.views.decorators.csrf import csrf_protect
-from django.core.management import call_command
-from io import StringIO
+from django.contrib.auth.models import User
 from functools import wraps
 import logging
 from django.urls import reverse
+from setup_num_runs import set_runs_per_day, calculate_interval
+import cfg_io
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dashboard cache keys and lifetimes in seconds
+STATUS_CACHE_KEY = 'scheduler:status'
+STATUS_CACHE_TTL = 30
+RECENT_LOGS_CACHE_TTL = 10
+
+def get_cached_status():
+    """Return the SchedulerStatus row, cached for a few seconds"""
+    return cache.get_or_set(STATUS_CACHE_KEY, lambda: SchedulerStatus.objects.get_or_create()[0], STATUS_CACHE_TTL)
+
+def get_cached_logs():
+    """Return the 10 most recent SchedulerLog rows, cached for a few seconds"""
+    return cache.get_or_set(
+        log_buffer.RECENT_LOGS_CACHE_KEY,
+        lambda: list(SchedulerLog.objects.all().order_by('-timestamp')[:10]),
+        RECENT_LOGS_CACHE_TTL
+    )
+
+def invalidate_dashboard_cache():
+    """Drop the cached status and logs after the scheduler state changes"""
+    cache.delete_many([STATUS_CACHE_KEY, log_buffer.RECENT_LOGS_CACHE_KEY])
+
+# Views the demo user is allowed to open
+DEMO_ALLOWED_VIEWS = ('email_config', 'process_audio', 'logout')
 
 def demo_user_required(view_func):
     """Decorator to handle demo user access"""
+    # Decided once per view rather than on every request
+    allowed_for_demo = view_func.__name__ in DEMO_ALLOWED_VIEWS
+
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         if not request.user.is_authenticated:
             return redirect('login')
             
         if request.user.username == 'visita':
-            # List of allowed views for demo user
-            allowed_views = ['email_config', 'process_audio', 'logout']
-            if view_func.__name__ not in allowed_views:
+            if not allowed_for_demo:
                 messages.warning(request, 'This page is not available in demo mode.')
                 return redirect('email_config')
                 
@@ -41,13 +82,33 @@ def demo_user_required(view_func):
 # Global variable to store the scheduler process
 scheduler_process = None
 
+# Start/stop requests run here one at a time, off the request thread
+toggle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scheduler-toggle')
+
+# File that receives the output of a scheduler started from the web interface
+SCHEDULER_OUTPUT_LOG = 'scheduler_output.log'
+
+def read_log_tail(path, start=0, max_bytes=4096):
+    """Return up to the last max_bytes written to a log file after offset start"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(start, f.tell() - max_bytes))
+            return f.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+def parse_json_body(request):
+    """Parse a JSON request body, with orjson when it's installed"""
+    if orjson is not None:
+        return orjson.loads(request.body)
+    return json.loads(request.body)
+
 def load_config():
     """Load configuration from config.json file"""
     config_path = os.path.join(settings.BASE_DIR, 'config.json')
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return cfg_io.read_json(config_path)
     except Exception as e:
         print(f"Error loading config.json: {str(e)}")
         return {}
@@ -56,25 +117,108 @@ def load_email_config():
     """Load configuration from email_config.json file"""
     config_path = os.path.join(settings.BASE_DIR, 'email_config.json')
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return cfg_io.read_json(config_path)
     except Exception as e:
         print(f"Error loading email_config.json: {str(e)}")
         return {'email': {'to': '', 'subject': '', 'message': ''}, 'send_demo_email': False}
 
-# Load config at module level
-config = load_config()
-web_interface_config = config.get('web_interface', {})
+def get_web_interface_config():
+    """Return the web_interface section of config.json"""
+    return load_config().get('web_interface', {})
+
+# Script name that identifies the scheduler in a process's command line
+SCHEDULER_SCRIPT = 'scheduler.py'
+
+# Last process lookup made by get_status, reused for PROCESS_CHECK_TTL seconds
+PROCESS_CHECK_TTL = 1.0
+_proc_cache = {'ts': 0.0, 'proc': None}
+_proc_cache_lock = threading.Lock()
+
+def find_scheduler_process_cached(pid=None):
+    """Like find_scheduler_process, but reuses a lookup made within the last second"""
+    with _proc_cache_lock:
+        now = time.monotonic()
+        if now - _proc_cache['ts'] < PROCESS_CHECK_TTL:
+            return _proc_cache['proc']
+        proc = find_scheduler_process(pid)
+        _proc_cache.update(ts=now, proc=proc)
+        return proc
+
+def invalidate_process_cache():
+    """Force the next status check to look the process up again"""
+    with _proc_cache_lock:
+        _proc_cache['ts'] = 0.0
+
+def is_scheduler_alive(pid):
+    """Check whether pid is a live scheduler process"""
+    if sys.platform.startswith('linux'):
+        # A single read of the process's argv; a zombie's cmdline is empty
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                return SCHEDULER_SCRIPT.encode() in f.read()
+        except OSError:
+            return False
+    
+    try:
+        proc = psutil.Process(pid)
+        return proc.status() != psutil.STATUS_ZOMBIE and any(SCHEDULER_SCRIPT in arg for arg in proc.cmdline())
+    except psutil.Error:
+        return False
+
+def find_scheduler_process(pid=None):
+    """Find the running scheduler process, checking the stored PID before scanning all processes"""
+    # pid_exists is a single kill(pid, 0) / OpenProcess call, so a dead PID costs
+    # nothing beyond that before falling back to the scan
+    if pid and psutil.pid_exists(pid):
+        try:
+            proc = psutil.Process(pid)
+            if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE \
+                    and any(SCHEDULER_SCRIPT in arg for arg in proc.cmdline()):
+                return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    # The PID is missing or stale (e.g. the scheduler was started outside the web interface)
+    if sys.platform.startswith('linux'):
+        return _scan_proc_for_scheduler()
+    
+    needle = SCHEDULER_SCRIPT
+    for proc in psutil.process_iter(['cmdline']):
+        for arg in proc.info['cmdline'] or ():
+            if needle in arg:
+                break
+        else:
+            continue
+        try:
+            # Accept any status except terminated or zombie; only checked for a match
+            if proc.status() not in ('terminated', 'zombie'):
+                return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return None
 
-def find_scheduler_process():
-    """Find the running scheduler process"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'status']):
+def _scan_proc_for_scheduler():
+    """Find the scheduler by reading /proc/<pid>/cmdline directly (Linux only)"""
+    needle = SCHEDULER_SCRIPT.encode()
+    # One buffer is reused for every process instead of allocating a bytes object each time
+    buf = bytearray(4096)
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit():
+            continue
+        try:
+            fd = os.open(f'/proc/{entry.name}/cmdline', os.O_RDONLY)
+            try:
+                length = os.readv(fd, [buf])
+            finally:
+                os.close(fd)
+        except OSError:
+            continue
+        if buf.find(needle, 0, length) == -1:
+            continue
         try:
-            if 'scheduler.py' in ' '.join(proc.info['cmdline'] or []):
-                # Accept any status except terminated or zombie
-                if proc.info['status'] not in ['terminated', 'zombie']:
-                    return proc
+            proc = psutil.Process(int(entry.name))
+            if proc.status() not in ('terminated', 'zombie'):
+                return proc
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             pass
     return None
@@ -83,8 +227,9 @@ def find_scheduler_process():
 @demo_user_required
 def dashboard(request):
     """Main dashboard view"""
-    status, created = SchedulerStatus.objects.get_or_create()
-    logs = SchedulerLog.objects.all().order_by('-timestamp')[:10]  # Get last 10 logs
+    status = get_cached_status()
+    log_buffer.flush()  # Show actions that are still waiting to be written
+    logs = get_cached_logs()  # Get last 10 logs
     
     # Load configurations
     config = load_config()
@@ -97,123 +242,210 @@ def dashboard(request):
         'email_config': email_config
     })
 
-@login_required
-@require_POST
-def toggle_scheduler(request):
-    """Toggle the scheduler on/off"""
-    status, created = SchedulerStatus.objects.get_or_create()
+def wait_pid(proc, timeout):
+    """
+    Wait up to timeout seconds for proc to exit, returning True if it did
+
+    On Linux the wait sleeps on a pidfd until the process exits, elsewhere it
+    falls back to psutil's polling wait.
+    """
+    try:
+        fd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        try:
+            proc.wait(timeout=timeout)
+            return True
+        except psutil.TimeoutExpired:
+            return False
+
+    try:
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        exited = bool(poller.poll(timeout * 1000))
+    finally:
+        os.close(fd)
+
+    if exited:
+        # Reap the process if it was started by this server
+        try:
+            proc.wait(timeout=0)
+        except (psutil.TimeoutExpired, psutil.NoSuchProcess):
+            pass
+    return exited
+
+def _record_toggle_error(status, message):
+    """Save why a background start or stop failed, so get_status can show it"""
+    try:
+        SchedulerStatus.objects.filter(pk=status.pk).update(last_error=message, last_updated=timezone.now())
+        invalidate_dashboard_cache()
+    except DatabaseError as e:
+        logging.error(f"Error saving scheduler error: {str(e)}")
+
+def _start_scheduler(user):
+    """Start the scheduler process and record the result"""
     global scheduler_process
+    status, created = SchedulerStatus.objects.get_or_create()
+    if status.is_running:
+        return
     
     try:
-        if not status.is_running:
-            # Get the full path to scheduler.py
-            scheduler_path = os.path.join(settings.BASE_DIR, 'scheduler.py')
-            python_exe = sys.executable
-            
-            # Start the scheduler
+        # Get the full path to scheduler.py
+        scheduler_path = os.path.join(settings.BASE_DIR, 'scheduler.py')
+        python_exe = sys.executable
+        
+        # Start the scheduler, with its output going to a log file so it can never
+        # block on a full pipe
+        output_log_path = os.path.join(settings.BASE_DIR, SCHEDULER_OUTPUT_LOG)
+        with open(output_log_path, 'ab', buffering=0) as output_log:
+            output_log_start = output_log.tell()
             scheduler_process = subprocess.Popen(
                 [python_exe, scheduler_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
+                stdin=subprocess.DEVNULL,
+                stdout=output_log,
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
             )
-            
-            # Give the process a moment to start
-            startup_delay = web_interface_config.get('process_startup_delay', 2)
-            time.sleep(startup_delay)
-            
-            # Check if process started successfully
-            if scheduler_process.poll() is not None:
-                error_output = scheduler_process.stderr.read()
-                # Check if the error is just about no files to process
-                if "No audio files found" in error_output or "No transcription to process" in error_output:
-                    # This is a normal case when there are no files to process
-                    status.is_running = True
-                    status.last_started = timezone.now()
-                    status.save()
-                    
-                    SchedulerLog.objects.create(
-                        user=request.user,
-                        action='start',
-                        success=True
-                    )
-                    messages.success(request, 'Scheduler started successfully (no files to process)')
-                    return redirect('dashboard')
-                else:
-                    raise Exception(f"Failed to start scheduler: {error_output}")
-            
-            status.is_running = True
-            status.last_started = timezone.now()
-            status.save()
-            
-            SchedulerLog.objects.create(
-                user=request.user,
-                action='start',
-                success=True
-            )
-            messages.success(request, 'Scheduler started successfully')
+        
+        # Give the process a moment to start, returning early if it exits
+        startup_delay = get_web_interface_config().get('process_startup_delay', 2)
+        deadline = time.monotonic() + startup_delay
+        interval = 0.01
+        while time.monotonic() < deadline and scheduler_process.poll() is None:
+            time.sleep(min(interval, max(0, deadline - time.monotonic())))
+            interval = min(interval * 2, 0.1)
+        
+        # Check if process started successfully
+        pid = scheduler_process.pid
+        if scheduler_process.poll() is not None:
+            error_output = read_log_tail(output_log_path, output_log_start)
+            # Check if the error is just about no files to process
+            if "No audio files found" in error_output or "No transcription to process" in error_output:
+                # This is a normal case when there are no files to process
+                pid = None
+            else:
+                raise RuntimeError(f"Failed to start scheduler: {error_output}")
+        
+        status.is_running = True
+        status.last_started = timezone.now()
+        status.pid = pid
+        status.last_error = None
+        status.save(update_fields=['is_running', 'last_started', 'pid', 'last_error', 'last_updated'])
+        invalidate_dashboard_cache()
+        invalidate_process_cache()
+        
+        log_buffer.log_action(user=user, action='start', success=True)
+    except (OSError, RuntimeError, subprocess.SubprocessError, psutil.Error, DatabaseError) as e:
+        logging.error(f"Error starting scheduler: {str(e)}")
+        log_buffer.log_action(user=user, action='start', success=False, error_message=str(e))
+        _record_toggle_error(status, f"Failed to start scheduler: {str(e)}")
+
+def _stop_scheduler(user):
+    """Stop the scheduler process and record the result"""
+    status, created = SchedulerStatus.objects.get_or_create()
+    if not status.is_running:
+        return
+    
+    try:
+        proc = find_scheduler_process(status.pid)
+        if proc:
+            proc.terminate()
+            termination_timeout = get_web_interface_config().get('process_termination_timeout', 5)
+            if not wait_pid(proc, termination_timeout):
+                proc.kill()
+        
+        status.is_running = False
+        status.last_stopped = timezone.now()
+        status.pid = None
+        status.last_error = None
+        status.save(update_fields=['is_running', 'last_stopped', 'pid', 'last_error', 'last_updated'])
+        invalidate_dashboard_cache()
+        invalidate_process_cache()
+        
+        log_buffer.log_action(user=user, action='stop', success=True)
+    except (psutil.Error, DatabaseError) as e:
+        logging.error(f"Error stopping scheduler: {str(e)}")
+        log_buffer.log_action(user=user, action='stop', success=False, error_message=str(e))
+        _record_toggle_error(status, f"Failed to stop scheduler: {str(e)}")
+
+def _run_toggle(action, user):
+    """Run a start or stop request on the toggle executor"""
+    try:
+        if action == 'start':
+            _start_scheduler(user)
         else:
-            # Stop the scheduler
-            proc = find_scheduler_process()
-            if proc:
-                proc.terminate()
-                try:
-                    termination_timeout = web_interface_config.get('process_termination_timeout', 5)
-                    proc.wait(timeout=termination_timeout)
-                except psutil.TimeoutExpired:
-                    proc.kill()
-            
-            status.is_running = False
-            status.last_stopped = timezone.now()
-            status.save()
-            
-            SchedulerLog.objects.create(
-                user=request.user,
-                action='stop',
-                success=True
-            )
-            messages.success(request, 'Scheduler stopped successfully')
-            
-    except Exception as e:
-        SchedulerLog.objects.create(
-            user=request.user,
-            action='start' if not status.is_running else 'stop',
-            success=False,
-            error_message=str(e)
-        )
-        messages.error(request, f'Error: {str(e)}')
+            _stop_scheduler(user)
+    finally:
+        # The executor thread keeps its own database connection
+        connection.close()
+
+@login_required
+@require_POST
+def toggle_scheduler(request):
+    """Toggle the scheduler on/off"""
+    # Read the row itself, a cached status could be stale and reverse the action
+    status, created = SchedulerStatus.objects.get_or_create()
+    action = 'stop' if status.is_running else 'start'
+    
+    # Starting and stopping take seconds, so they run in the background and the
+    # dashboard picks up the result through get_status
+    toggle_executor.submit(_run_toggle, action, request.user)
+    messages.info(request, f'Scheduler {action} requested, the status below shows the result')
     
     return redirect('dashboard')
 
 @login_required
 def get_status(request):
     """API endpoint to get current scheduler status"""
-    status, created = SchedulerStatus.objects.get_or_create()
+    status = get_cached_status()
+    is_running_saved = status.is_running
+    last_started = status.last_started
+    last_stopped = status.last_stopped
+    last_error = status.last_error
     
-    # Check if process is actually running
-    proc = find_scheduler_process()
-    is_running = proc is not None
+    # Check if process is actually running, trying the stored PID before any lookup
+    if status.pid and is_scheduler_alive(status.pid):
+        pid = status.pid
+    else:
+        proc = find_scheduler_process_cached(status.pid)
+        pid = proc.pid if proc else None
+    is_running = pid is not None
     
-    # Only update status if it's been more than grace period since last start
-    if status.is_running != is_running:
-        if not is_running and status.last_started:
-            grace_period = web_interface_config.get('status_check_grace_period', 5)
-            time_since_start = (timezone.now() - status.last_started).total_seconds()
+    # Only write to the database when the state actually changed, and only the changed fields
+    if is_running_saved != is_running:
+        if not is_running and last_started:
+            grace_period = get_web_interface_config().get('status_check_grace_period', 5)
+            time_since_start = (timezone.now() - last_started).total_seconds()
             if time_since_start > grace_period:  # Only update if it's been more than grace period
-                status.is_running = is_running
-                status.last_stopped = timezone.now()
-                status.save()
+                is_running_saved = is_running
+                last_stopped = timezone.now()
+                SchedulerStatus.objects.filter(pk=status.pk).update(
+                    is_running=is_running, last_stopped=last_stopped, pid=None, last_updated=last_stopped
+                )
+                invalidate_dashboard_cache()
         elif is_running:  # If we found a running process, always update
-            status.is_running = is_running
-            status.save()
+            is_running_saved = is_running
+            # Store the PID so later checks can look it up directly
+            SchedulerStatus.objects.filter(pk=status.pk).update(
+                is_running=is_running, pid=pid, last_updated=timezone.now()
+            )
+            invalidate_dashboard_cache()
+    
+    # Let the browser reuse its copy of the response while nothing has changed
+    etag = '"' + hashlib.blake2b(
+        f'{is_running_saved}|{last_started}|{last_stopped}|{last_error}'.encode(), digest_size=8
+    ).hexdigest() + '"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        return HttpResponseNotModified()
     
-    return JsonResponse({
-        'is_running': status.is_running,
-        'last_started': status.last_started.isoformat() if status.last_started else None,
-        'last_stopped': status.last_stopped.isoformat() if status.last_stopped else None
+    response = JsonResponse({
+        'is_running': is_running_saved,
+        'last_started': last_started.isoformat() if last_started else None,
+        'last_stopped': last_stopped.isoformat() if last_stopped else None,
+        'last_error': last_error
     })
+    response['ETag'] = etag
+    return response
 
 @login_required
 @csrf_protect
@@ -221,7 +453,7 @@ def get_status(request):
 def update_runs_per_day(request):
     """Update the runs per day configuration in config.json"""
     try:
-        data = json.loads(request.body)
+        data = parse_json_body(request)
         runs_per_day = data.get('runs_per_day')
         
         if runs_per_day is None:
@@ -236,52 +468,23 @@ def update_runs_per_day(request):
                 'error': 'Invalid runs_per_day value. Must be a non-negative integer.'
             })
             
-        # Get the path to setup_num_runs.py
-        setup_script = os.path.join(settings.BASE_DIR, 'setup_num_runs.py')
-        python_exe = sys.executable
-        
-        # Run the setup script
-        result = subprocess.run(
-            [python_exe, setup_script, str(runs_per_day)],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
+        # Update config.json directly rather than through a setup_num_runs.py subprocess
+        try:
+            set_runs_per_day(runs_per_day)
+        except (OSError, ValueError) as e:
             return JsonResponse({
                 'success': False,
-                'error': f'Failed to update configuration: {result.stderr}'
+                'error': f'Failed to update configuration: {str(e)}'
             })
             
-        # Calculate the interval text
-        if runs_per_day == 0:
-            interval = "Run once and exit"
-        else:
-            seconds_per_day = 86400
-            interval_seconds = seconds_per_day / runs_per_day
-            
-            days, remainder = divmod(interval_seconds, 86400)
-            hours, remainder = divmod(remainder, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            
-            parts = []
-            if days > 0:
-                parts.append(f"{int(days)} day{'s' if days > 1 else ''}")
-            if hours > 0:
-                parts.append(f"{int(hours)} hour{'s' if hours > 1 else ''}")
-            if minutes > 0:
-                parts.append(f"{int(minutes)} minute{'s' if minutes > 1 else ''}")
-            if seconds > 0 and not parts:
-                parts.append(f"{int(seconds)} second{'s' if seconds > 1 else ''}")
-                
-            interval = "Every " + " and ".join(parts)
+        interval = calculate_interval(runs_per_day)
         
         return JsonResponse({
             'success': True,
             'interval': interval
         })
         
-    except Exception as e:
+    except (ValueError, AttributeError) as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
@@ -293,7 +496,7 @@ def update_runs_per_day(request):
 def update_email_config(request):
     """Update the email configuration in email_config.json"""
     try:
-        data = json.loads(request.body)
+        data = parse_json_body(request)
         
         # Validate email configuration
         email_config = data.get('email', {})
@@ -325,16 +528,24 @@ def update_email_config(request):
             'send_demo_email': send_demo_email
         }
         
-        # Save to email_config.json
+        # Save to email_config.json, skipping the write if nothing changed
         config_path = os.path.join(settings.BASE_DIR, 'email_config.json')
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4)
+        try:
+            if cfg_io.read_json(config_path) == config:
+                return JsonResponse({
+                    'success': True,
+                    'unchanged': True
+                })
+        except FileNotFoundError:
+            pass
+        
+        cfg_io.write_json(config_path, config)
         
         return JsonResponse({
             'success': True
         })
         
-    except Exception as e:
+    except (OSError, ValueError, AttributeError) as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
@@ -351,14 +562,38 @@ def email_config(request):
 def is_superuser(user):
     return user.is_superuser
 
+def _create_superuser(username, email, password):
+    """Create a superuser account"""
+    User.objects.create_superuser(username=username, email=email, password=password)
+    return f'Superuser "{username}" created successfully.'
+
+def _create_user(username, password):
+    """Create a regular user account"""
+    User.objects.create_user(username=username, password=password)
+    return f'User "{username}" created successfully.'
+
+def _change_password(username, password):
+    """Set a new password for an existing user"""
+    user = User.objects.get(username=username)
+    user.set_password(password)
+    user.save(update_fields=['password'])
+    return f'Password changed successfully for user "{username}".'
+
+# User management commands available from the dashboard, called with the form's arguments in order
+USER_COMMANDS = {
+    'createsuperuser': _create_superuser,
+    'createuser': _create_user,
+    'changepassword': _change_password,
+}
+
 @login_required
 @user_passes_test(is_superuser)
 @csrf_protect
 @require_POST
 def execute_management_command(request):
-    """Execute Django management commands"""
+    """Run one of the dashboard's user management commands"""
     try:
-        data = json.loads(request.body)
+        data = parse_json_body(request)
         command = data.get('command')
         args = data.get('args', [])
         
@@ -369,29 +604,30 @@ def execute_management_command(request):
             })
             
         # Only allow specific commands
-        allowed_commands = ['createsuperuser', 'createuser', 'changepassword']
-        if command not in allowed_commands:
+        if command not in USER_COMMANDS:
             return JsonResponse({
                 'success': False,
-                'error': f'Command not allowed. Allowed commands: {", ".join(allowed_commands)}'
+                'error': f'Command not allowed. Allowed commands: {", ".join(USER_COMMANDS)}'
             })
             
-        # Capture command output
-        output = StringIO()
         try:
-            call_command(command, *args, stdout=output)
+            output = USER_COMMANDS[command](*args)
             return JsonResponse({
                 'success': True,
-                'output': output.getvalue()
+                'output': output
             })
-        except Exception as e:
+        except TypeError:
             return JsonResponse({
                 'success': False,
-                'error': str(e),
-                'output': output.getvalue()
+                'error': f'Wrong number of arguments for {command}'
+            })
+        except (User.DoesNotExist, IntegrityError, ValueError) as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
             })
             
-    except Exception as e:
+    except (ValueError, AttributeError) as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
@@ -403,6 +639,29 @@ def record(request):
     """View for the audio recording page."""
     return render(request, 'scheduler_control/record.html')
 
+# Pipeline runs take turns: openai_whisper keeps one AsyncOpenAI client for the
+# event loop in use, and a second loop in another thread would replace it
+_demo_pipeline_lock = threading.Lock()
+
+def _run_demo_pipeline(audio_path):
+    """Run the sending_demo_email pipeline in this process for one uploaded recording"""
+    try:
+        # Imported on first use; later uploads reuse the loaded modules and clients
+        import sending_demo_email
+        with _demo_pipeline_lock:
+            asyncio.run(sending_demo_email.main(audio_path))
+        logging.info("Demo email pipeline finished")
+    except Exception as e:
+        logging.error(f"Error running demo email pipeline: {str(e)}")
+    finally:
+        # The pipeline deletes the recording once it's emailed; don't leave failed ones behind
+        try:
+            os.remove(audio_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.error(f"Error deleting uploaded recording {audio_path}: {str(e)}")
+
 @login_required
 @demo_user_required
 @csrf_protect
@@ -419,22 +678,18 @@ def process_audio(request):
         upload_dir = os.path.join(settings.MEDIA_ROOT, 'audio_uploads')
         os.makedirs(upload_dir, exist_ok=True)
         
-        # Save the file as incoming_recording.wav
-        file_path = os.path.join(upload_dir, 'incoming_recording.wav')
-        with open(file_path, 'wb+') as destination:
-            for chunk in audio_file.chunks():
-                destination.write(chunk)
+        # Save each upload under its own name, so a new upload can't overwrite
+        # a recording that is still being transcribed
+        fd, file_path = tempfile.mkstemp(dir=upload_dir, prefix='incoming_recording_', suffix='.wav')
+        with os.fdopen(fd, 'wb', buffering=1 << 20) as destination:
+            shutil.copyfileobj(audio_file, destination, length=1 << 20)
         
-        # Execute sending_demo_email.py after saving the file
-        try:
-            subprocess.run([sys.executable, 'sending_demo_email.py'], check=True)
-            logging.info("Successfully executed sending_demo_email.py")
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Error executing sending_demo_email.py: {str(e)}")
-            # Continue with the response even if email script fails
+        # Transcribe and email the recording in the background; the response
+        # doesn't depend on the email being sent
+        threading.Thread(target=_run_demo_pipeline, args=(file_path,), name='demo-email', daemon=True).start()
         
         # Log the successful upload
-        SchedulerLog.objects.create(
+        log_buffer.log_action(
             user=request.user,
             action='audio_upload',
             success=True,
@@ -442,13 +697,13 @@ def process_audio(request):
         )
         
         return JsonResponse({
-            'message': 'Audio file received and processed successfully',
+            'message': 'Audio file received; it will be transcribed and emailed shortly',
             'file_path': file_path
         })
         
     except Exception as e:
         # Log the error
-        SchedulerLog.objects.create(
+        log_buffer.log_action(
             user=request.user,
             action='audio_upload',
             success=False,
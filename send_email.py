@@ -18,11 +18,12 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-import pickle
+import threading
 
-# If modifying these scopes, delete the token_gmail.pickle file
+# If modifying these scopes, delete the token_gmail.json file
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.send',
     'https://www.googleapis.com/auth/gmail.compose',
@@ -30,7 +31,14 @@ SCOPES = [
     'https://mail.google.com/'
 ]
 CREDENTIALS_FILE = 'credentials_gmail.json'
-TOKEN_FILE = 'token_gmail.pickle'
+TOKEN_FILE = 'token_gmail.json'
+LEGACY_TOKEN_FILE = 'token_gmail.pickle'  # Older token format, converted on first use
+
+# Gmail service, credentials and sender address, built once per process by get_service()
+_creds = None
+_service = None
+_sender = None
+_service_lock = threading.Lock()
 
 def load_email_config():
     """Load email configuration from email_config.json file"""
@@ -66,12 +74,18 @@ def authenticate_gmail():
     """Authenticate with Gmail API using OAuth."""
     creds = None
     
-    # The token_gmail.pickle file stores the user's access and refresh tokens
+    # The token_gmail.json file stores the user's access and refresh tokens
     if os.path.exists(TOKEN_FILE):
         print(f"Found existing {TOKEN_FILE} file")
-        with open(TOKEN_FILE, 'rb') as token:
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        print("Current scopes:", creds.scopes)
+    elif os.path.exists(LEGACY_TOKEN_FILE):
+        # Convert a token saved by earlier versions, so the user doesn't have to log in again
+        import pickle
+        print(f"Converting {LEGACY_TOKEN_FILE} to {TOKEN_FILE}")
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
             creds = pickle.load(token)
-            print("Current scopes:", creds.scopes)
+        save_token(creds)
             
     # If no valid credentials are available, let the user log in
     if not creds or not creds.valid:
@@ -93,11 +107,45 @@ def authenticate_gmail():
             
         # Save the credentials for the next run
         print(f"Saving token to {TOKEN_FILE}...")
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        save_token(creds)
             
     return creds
 
+def save_token(creds):
+    """Save the credentials to the token file as JSON"""
+    with open(TOKEN_FILE, 'w', encoding='utf-8') as token:
+        token.write(creds.to_json())
+
+def get_service():
+    """
+    Return the Gmail API service and the authenticated sender address.
+
+    The service is built on first use and reused afterwards; the credentials are
+    only refreshed once they expire.
+    """
+    global _creds, _service, _sender
+    with _service_lock:
+        if _service is not None:
+            if _creds.valid:
+                return _service, _sender
+            if _creds.expired and _creds.refresh_token:
+                # The service holds the same credentials object, so it uses the new token
+                _creds.refresh(Request())
+                save_token(_creds)
+                return _service, _sender
+
+        creds = authenticate_gmail()
+        if not creds:
+            return None, None
+
+        # Create Gmail API service from the discovery document bundled with the
+        # client library, and get the authenticated user's email address
+        service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
+        user_profile = service.users().getProfile(userId='me').execute()
+
+        _creds, _service, _sender = creds, service, user_profile['emailAddress']
+        return _service, _sender
+
 def create_message(sender, to, subject, message_text):
     """Create a message for an email."""
     message = MIMEText(message_text)
@@ -117,10 +165,15 @@ def create_message_with_attachment(sender, to, subject, message_text, attachment
     msg = MIMEText(message_text)
     message.attach(msg)
 
-    # Add attachment if provided
-    if attachment_path and os.path.exists(attachment_path):
-        with open(attachment_path, 'rb') as f:
-            attachment = MIMEApplication(f.read())
+    # Add attachment if provided (a missing file is skipped, as before)
+    if attachment_path:
+        try:
+            with open(attachment_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+        if data is not None:
+            attachment = MIMEApplication(data)
             attachment.add_header(
                 'Content-Disposition', 
                 'attachment', 
@@ -128,7 +181,8 @@ def create_message_with_attachment(sender, to, subject, message_text, attachment
             )
             message.attach(attachment)
 
-    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')}
+    # The Gmail API takes the serialized message base64url-encoded; serialize it once
+    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode('ascii')}
 
 def send_message(service, user_id, message):
     """Send an email message."""
@@ -158,18 +212,11 @@ def send_demo_email(transcription_text):
             return False, "Missing required email parameters in config"
 
         # Authenticate with Gmail
-        creds = authenticate_gmail()
-        if not creds:
+        service, sender = get_service()
+        if not service:
             return False, "Failed to authenticate with Gmail"
 
         try:
-            # Create Gmail API service
-            service = build('gmail', 'v1', credentials=creds)
-            
-            # Get the authenticated user's email address
-            user_profile = service.users().getProfile(userId='me').execute()
-            sender = user_profile['emailAddress']
-            
             # Create message with transcription in body
             message = create_message(
                 sender,
@@ -210,7 +257,7 @@ def main():
 
     try:
         # Create Gmail API service
-        service = build('gmail', 'v1', credentials=creds)
+        service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
         
         # Get the authenticated user's email address
         user_profile = service.users().getProfile(userId='me').execute()
@@ -19,16 +19,8 @@ import asyncio
 from pathlib import Path
 from datetime import datetime
 
-# Import required modules from existing codebase
-from transcribe_config import TRANSCRIBE_CONFIG
-from openai_whisper import transcribe_with_whisper1, transcribe_with_4o, load_config
-from send_email import load_email_config, send_demo_email
-
-# Configure logging to console
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# The transcription and Gmail modules pull in the OpenAI and Google client
+# libraries, so they're imported only once there's a file to process
 
 def check_audio_uploads():
     """Check if there are any audio files in the uploads directory"""
@@ -48,10 +40,11 @@ def check_audio_uploads():
     # Return the first audio file found
     return str(audio_files[0])
 
-def process_audio_file(audio_path):
+async def process_audio_file(audio_path):
     """Process the audio file using configured transcription model"""
     try:
         logging.info(f"Processing audio file: {audio_path}")
+        from openai_whisper import transcribe_with_whisper1, transcribe_with_4o, load_config, close_async_openai_client
         
         # Load configurations
         transcribe_config, output_config, model_capabilities = load_config()
@@ -59,13 +52,17 @@ def process_audio_file(audio_path):
         # Determine which transcription function to use based on model type
         model_type = transcribe_config.get('model_type', 'whisper-1')
         
-        if model_type == 'whisper-1':
-            transcription = transcribe_with_whisper1(audio_path, transcribe_config, output_config)
-        elif model_type == '4o-transcribe':
-            transcription = transcribe_with_4o(audio_path, transcribe_config, output_config)
-        else:
-            logging.error(f"Unsupported model type: {model_type}")
-            return None
+        # The API client belongs to this event loop, so close it before the loop ends
+        try:
+            if model_type == 'whisper-1':
+                transcription = await transcribe_with_whisper1(audio_path, transcribe_config, output_config)
+            elif model_type == '4o-transcribe':
+                transcription = await transcribe_with_4o(audio_path, transcribe_config, output_config)
+            else:
+                logging.error(f"Unsupported model type: {model_type}")
+                return None
+        finally:
+            await close_async_openai_client()
         
         if not transcription:
             logging.error("No transcription generated")
@@ -78,6 +75,15 @@ def process_audio_file(audio_path):
         logging.error(f"Error processing audio file: {str(e)}")
         return None
 
+def demo_email_enabled():
+    """Check whether email_config.json has the demo email switched on"""
+    try:
+        with open('email_config.json', 'r', encoding='utf-8') as f:
+            return json.load(f).get('send_demo_email', False)
+    except Exception as e:
+        logging.error(f"Error reading email_config.json: {str(e)}")
+        return False
+
 def cleanup_processed_file(audio_path):
     """Delete the processed audio file"""
     try:
@@ -86,21 +92,23 @@ def cleanup_processed_file(audio_path):
     except Exception as e:
         logging.error(f"Error deleting file: {str(e)}")
 
-async def main():
-    """Main function to run the demo email pipeline"""
+async def main(audio_file=None):
+    """
+    Main function to run the demo email pipeline
+    
+    audio_file is the recording to process; if not given, the first file in the
+    uploads directory is used.
+    """
     logging.info("Starting demo email pipeline")
     
     # Check for audio files
-    audio_file = check_audio_uploads()
+    if audio_file is None:
+        audio_file = check_audio_uploads()
     if not audio_file:
         logging.info("No audio files to process. Exiting.")
         return
         
-    # Process the audio file
-    transcription = process_audio_file(audio_file)
-    if not transcription:
-        logging.error("Failed to process audio file. Exiting.")
-        return
+    from send_email import load_email_config, send_demo_email, get_service
         
     # Load email configuration
     try:
@@ -109,13 +117,30 @@ async def main():
         logging.error(f"Error loading email config: {str(e)}")
         return
         
+    # Transcribe while setting up the Gmail service in a worker thread, so
+    # authentication is hidden behind the transcription
+    if demo_email_enabled():
+        authentication = asyncio.to_thread(get_service)
+    else:
+        authentication = asyncio.sleep(0)  # send_demo_email reports that it's disabled
+    transcription, service = await asyncio.gather(
+        process_audio_file(audio_file),
+        authentication,
+        return_exceptions=True
+    )
+    if isinstance(transcription, Exception) or not transcription:
+        logging.error("Failed to process audio file. Exiting.")
+        return
+    if isinstance(service, Exception):
+        logging.error(f"Error authenticating with Gmail: {str(service)}")
+        return
+        
     # Send email with transcription
-    try:
-        send_demo_email(transcription)
-        logging.info("Email sent successfully")
-    except Exception as e:
-        logging.error(f"Error sending email: {str(e)}")
+    success, message = send_demo_email(transcription)
+    if not success:
+        logging.error(f"Error sending email: {message}")
         return
+    logging.info(message)
         
     # Cleanup
     cleanup_processed_file(audio_file)
@@ -123,4 +148,9 @@ async def main():
     logging.info("Demo email pipeline completed successfully")
 
 if __name__ == "__main__":
+    # Configure logging to console (the web interface runs main() with its own logging)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(main()) 
\ No newline at end of file
@@ -20,14 +20,18 @@ Example:
 """
 
 import json
-import os
 import re
 import argparse
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+from cfg_io import read_json, write_json
+
 CONFIG_FILE = 'email_config.json'
 
+# Email address format accepted by validate_email, compiled once
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class EmailConfigError(Exception):
     """Base exception for email configuration errors."""
     pass
@@ -50,8 +54,18 @@ def validate_email(email: str) -> bool:
     Returns:
         bool: True if email is valid, False otherwise
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return EMAIL_RE.match(email) is not None
+
+def _default_config() -> Dict[str, Any]:
+    """Return the configuration used until email_config.json exists"""
+    return {
+        "email": {
+            "to": "recipient@example.com",
+            "subject": "Test Email from Gmail API",
+            "message": "This is a test email sent using the Gmail API."
+        },
+        "send_demo_email": False
+    }
 
 def load_config() -> Dict[str, Any]:
     """
@@ -66,20 +80,10 @@ def load_config() -> Dict[str, Any]:
     try:
         config_path = Path(CONFIG_FILE)
         if not config_path.exists():
-            # Create default config if file doesn't exist
-            default_config = {
-                "email": {
-                    "to": "recipient@example.com",
-                    "subject": "Test Email from Gmail API",
-                    "message": "This is a test email sent using the Gmail API."
-                },
-                "send_demo_email": False
-            }
-            save_config(default_config)
-            return default_config
+            # Use the defaults; the file is created by the first save
+            return _default_config()
             
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = read_json(config_path)
             
         # Validate config structure
         if not isinstance(config, dict):
@@ -96,50 +100,83 @@ def load_config() -> Dict[str, Any]:
     except Exception as e:
         raise ConfigFileError(f"Error loading configuration: {str(e)}")
 
-def save_config(config: Dict[str, Any]) -> None:
+def save_config(config: Dict[str, Any], *, pretty: bool = False) -> None:
     """
     Save the email configuration to file.
     
     Args:
         config: The configuration to save
+        pretty: Indent the JSON for people to read; compact otherwise
         
     Raises:
         ConfigFileError: If there's an error saving the config file
     """
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4)
+        write_json(CONFIG_FILE, config, pretty=pretty)
     except Exception as e:
         raise ConfigFileError(f"Error saving configuration: {str(e)}")
 
-def update_recipient(email: str) -> bool:
+def _is_text(value: Any) -> bool:
+    """Check for a non-empty string"""
+    return isinstance(value, str) and bool(value)
+
+# Settable fields by dotted key: (check, exception raised if it fails, message)
+_FIELDS = {
+    'email.to': (validate_email, InvalidEmailError, "Invalid email format: {value}"),
+    'email.subject': (_is_text, ValueError, "Subject must be a non-empty string"),
+    'email.message': (_is_text, ValueError, "Message must be a non-empty string"),
+    'send_demo_email': (lambda value: isinstance(value, bool), ValueError, "send_demo must be a boolean value"),
+}
+
+def _set(config: Dict[str, Any], key: str, value: Any) -> None:
     """
-    Update the recipient email address.
+    Validate a value and set it in a loaded configuration.
     
     Args:
-        email: The new recipient email address
-        
-    Returns:
-        bool: True if successful, False otherwise
+        config: The loaded configuration
+        key: Dotted path of the field, e.g. 'email.to'
+        value: The new value
         
     Raises:
-        InvalidEmailError: If the email format is invalid
+        InvalidEmailError: If an email address is invalid
+        ValueError: If another value is invalid
     """
+    check, error, message = _FIELDS[key]
+    if not check(value):
+        raise error(message.format(value=value))
+    
+    *parents, field = key.split('.')
+    target = config
+    for part in parents:
+        target = target[part]
+    target[field] = value
+
+def _update(key: str, value: Any, name: str) -> bool:
+    """Load the configuration, set one field and save it"""
     try:
-        if not validate_email(email):
-            raise InvalidEmailError(f"Invalid email format: {email}")
-            
         config = load_config()
-        config['email']['to'] = email
+        _set(config, key, value)
         save_config(config)
         return True
     except InvalidEmailError as e:
         print(f"Error: {str(e)}")
         return False
     except Exception as e:
-        print(f"Error updating recipient: {str(e)}")
+        print(f"Error updating {name}: {str(e)}")
         return False
 
+def update_recipient(email: str) -> bool:
+    """
+    Update the recipient email address.
+    
+    Args:
+        email: The new recipient email address
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    return _update('email.to', email, 'recipient')
+
 def update_subject(subject: str) -> bool:
     """
     Update the email subject.
@@ -150,17 +187,7 @@ def update_subject(subject: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        if not subject or not isinstance(subject, str):
-            raise ValueError("Subject must be a non-empty string")
-            
-        config = load_config()
-        config['email']['subject'] = subject
-        save_config(config)
-        return True
-    except Exception as e:
-        print(f"Error updating subject: {str(e)}")
-        return False
+    return _update('email.subject', subject, 'subject')
 
 def update_message(message: str) -> bool:
     """
@@ -172,17 +199,7 @@ def update_message(message: str) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        if not message or not isinstance(message, str):
-            raise ValueError("Message must be a non-empty string")
-            
-        config = load_config()
-        config['email']['message'] = message
-        save_config(config)
-        return True
-    except Exception as e:
-        print(f"Error updating message: {str(e)}")
-        return False
+    return _update('email.message', message, 'message')
 
 def update_send_demo_email(send_demo: bool) -> bool:
     """
@@ -194,27 +211,45 @@ def update_send_demo_email(send_demo: bool) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        if not isinstance(send_demo, bool):
-            raise ValueError("send_demo must be a boolean value")
-            
-        config = load_config()
-        config['send_demo_email'] = send_demo
-        save_config(config)
-        return True
-    except Exception as e:
-        print(f"Error updating send_demo_email: {str(e)}")
-        return False
+    return _update('send_demo_email', send_demo, 'send_demo_email')
+
+def _email_arg(value: str) -> str:
+    """argparse type for --recipient: a valid email address"""
+    if not validate_email(value):
+        raise argparse.ArgumentTypeError(f"Invalid email format: {value}")
+    return value
+
+def _text_arg(value: str) -> str:
+    """argparse type for --subject and --message: a non-empty string"""
+    if not value:
+        raise argparse.ArgumentTypeError("must be a non-empty string")
+    return value
+
+def _bool_arg(value: str) -> bool:
+    """argparse type for --send-demo: 'true' or 'false'"""
+    value = value.lower()
+    if value not in ('true', 'false'):
+        raise argparse.ArgumentTypeError(f"invalid choice: '{value}' (choose from 'true', 'false')")
+    return value == 'true'
 
-def show_config() -> None:
+# Command-line options applied by main(): (argument, field); argparse has already validated the values
+CLI_UPDATES = [
+    ('recipient', 'email.to'),
+    ('subject', 'email.subject'),
+    ('message', 'email.message'),
+    ('send_demo', 'send_demo_email'),
+]
+
+def show_config(config: Optional[Dict[str, Any]] = None) -> None:
     """
     Display the current email configuration.
     
-    Raises:
-        ConfigFileError: If there's an error loading the configuration
+    Args:
+        config: Configuration to show; loaded from file if not given
     """
     try:
-        config = load_config()
+        if config is None:
+            config = load_config()
         print("\nCurrent Email Configuration:")
         print("---------------------------")
         print(f"Recipient: {config['email']['to']}")
@@ -228,10 +263,10 @@ def show_config() -> None:
 def main():
     parser = argparse.ArgumentParser(description='Update email configuration parameters')
     
-    parser.add_argument('--recipient', help='Set the recipient email address')
-    parser.add_argument('--subject', help='Set the email subject')
-    parser.add_argument('--message', help='Set the email message')
-    parser.add_argument('--send-demo', type=str, choices=['true', 'false'], 
+    parser.add_argument('--recipient', type=_email_arg, help='Set the recipient email address')
+    parser.add_argument('--subject', type=_text_arg, help='Set the email subject')
+    parser.add_argument('--message', type=_text_arg, help='Set the email message')
+    parser.add_argument('--send-demo', type=_bool_arg, metavar='{true,false}',
                        help='Set whether to send demo email (true/false)')
     parser.add_argument('--show', action='store_true', help='Show current configuration')
     
@@ -242,33 +277,19 @@ def main():
             show_config()
             return
         
-        if not any([args.recipient, args.subject, args.message, args.send_demo]):
+        updates = [(key, getattr(args, arg)) for arg, key in CLI_UPDATES if getattr(args, arg) is not None]
+        if not updates:
             parser.print_help()
             return
         
-        success = True
-        
-        if args.recipient:
-            if not update_recipient(args.recipient):
-                success = False
-        
-        if args.subject:
-            if not update_subject(args.subject):
-                success = False
-        
-        if args.message:
-            if not update_message(args.message):
-                success = False
-        
-        if args.send_demo:
-            if not update_send_demo_email(args.send_demo.lower() == 'true'):
-                success = False
+        # Apply every requested change to one loaded copy and write the file once
+        config = load_config()
+        for key, value in updates:
+            _set(config, key, value)
+        save_config(config)
         
-        if success:
-            print("\nConfiguration updated successfully!")
-            show_config()
-        else:
-            print("\nSome updates failed. Please check the error messages above.")
+        print("\nConfiguration updated successfully!")
+        show_config(config)
             
     except Exception as e:
         print(f"\nAn unexpected error occurred: {str(e)}")
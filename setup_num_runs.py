@@ -21,10 +21,16 @@ import sys
 import json
 import argparse
 from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from cfg_io import read_json, write_json
+
+CONFIG_PATH = Path(__file__).resolve().parent / 'config.json'
 
 def load_config():
     """Load configuration from config.json file"""
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+    config_path = CONFIG_PATH
     
     # Check if config file exists
     if not os.path.exists(config_path):
@@ -33,8 +39,7 @@ def load_config():
     
     # Try to load and parse the config file
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = read_json(config_path)
         return config, config_path
         
     except json.JSONDecodeError as e:
@@ -47,20 +52,47 @@ def load_config():
 def save_config(config, config_path):
     """Save the updated configuration to config.json file"""
     try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        write_json(config_path, config, pretty=True)
         return True
     except Exception as e:
         print(f"ERROR: Failed to save config.json: {str(e)}")
         sys.exit(1)
 
+def set_runs_per_day(runs_per_day):
+    """
+    Set scheduler.runs_per_day in config.json
+
+    Unlike the command-line entry point this raises instead of exiting, so it
+    can be called from the web interface.
+
+    Returns:
+    --------
+    int
+        The previous runs_per_day value
+    """
+    if runs_per_day < 0:
+        raise ValueError("Number of runs per day cannot be negative")
+
+    config_path = CONFIG_PATH
+    config = read_json(config_path)
+
+    scheduler_config = config.setdefault("scheduler", {})
+    previous_runs = scheduler_config.get("runs_per_day", 1)
+    if "runs_per_day" in scheduler_config and previous_runs == runs_per_day:
+        return previous_runs  # Already set, leave the file alone
+    scheduler_config["runs_per_day"] = runs_per_day
+
+    write_json(config_path, config, pretty=True)
+    return previous_runs
+
+@lru_cache(maxsize=64)
 def calculate_interval(runs_per_day):
-    """Calculate interval in seconds based on runs per day"""
+    """Calculate interval in seconds based on runs per day (cached, the UI offers few values)"""
     if runs_per_day == 0:
         return "Run once and exit"
         
-    seconds_per_day = 86400
-    interval_seconds = seconds_per_day / runs_per_day
+    # Whole seconds are enough for display; never less than one
+    interval_seconds = max(1, 86400 // runs_per_day)
     
     # Format the interval as a human-readable time
     days, remainder = divmod(interval_seconds, 86400)
@@ -68,19 +100,16 @@ def calculate_interval(runs_per_day):
     minutes, seconds = divmod(remainder, 60)
     
     parts = []
-    if days > 0:
-        parts.append(f"{int(days)} day{'s' if days > 1 else ''}")
-    if hours > 0:
-        parts.append(f"{int(hours)} hour{'s' if hours > 1 else ''}")
-    if minutes > 0:
-        parts.append(f"{int(minutes)} minute{'s' if minutes > 1 else ''}")
-    if seconds > 0 and not parts:  # Only show seconds if no larger units or value is small
-        parts.append(f"{int(seconds)} second{'s' if seconds > 1 else ''}")
+    if days:
+        parts.append(f"{days} day{'s' if days > 1 else ''}")
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
+    if minutes:
+        parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
+    if seconds and not parts:  # Only show seconds if no larger units or value is small
+        parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
     
-    if parts:
-        return "Every " + " and ".join(parts)
-    else:
-        return "Every 24 hours"  # Fallback for when no parts could be generated
+    return "Every " + " and ".join(parts)
 
 def main():
     # Set up argument parser
@@ -12,16 +12,27 @@ python setup_openai.py
 """
 
 import os
-import json
-import getpass
 import sys
+import getpass
 
-try:
-    from openai import OpenAI
-except ImportError:
-    print("Error: OpenAI Python package not found.")
-    print("Please install it first with: pip install openai")
-    sys.exit(1)
+from cfg_io import read_json, write_json
+
+def set_user_environment_variable(name, value):
+    """Set a persistent user environment variable on Windows"""
+    import ctypes
+    import winreg
+    
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 'Environment', 0, winreg.KEY_SET_VALUE) as key:
+        winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value)
+    
+    # Tell running programs (e.g. Explorer) that the environment changed, like setx does
+    HWND_BROADCAST = 0xFFFF
+    WM_SETTINGCHANGE = 0x001A
+    SMTO_ABORTIFHUNG = 0x0002
+    ctypes.windll.user32.SendMessageTimeoutW(
+        HWND_BROADCAST, WM_SETTINGCHANGE, 0, 'Environment',
+        SMTO_ABORTIFHUNG, 1000, ctypes.byref(ctypes.c_ulong())
+    )
 
 def save_api_key(api_key, save_to_env=False, save_to_config=True):
     """Save the API key to the configuration file and/or environment variable"""
@@ -29,38 +40,27 @@ def save_api_key(api_key, save_to_env=False, save_to_config=True):
     
     # Save to configuration file
     if save_to_config:
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openai_config.json')
         try:
-            # Check if openai_config.py exists
-            if os.path.exists('openai_config.py'):
-                # Read the current content
-                with open('openai_config.py', 'r') as file:
-                    content = file.read()
-                
-                # Replace the API key line
-                if '"api_key": ""' in content:
-                    content = content.replace('"api_key": ""', f'"api_key": "{api_key}"')
-                    
-                    # Write the updated content
-                    with open('openai_config.py', 'w') as file:
-                        file.write(content)
-                        
-                    print("✅ API key saved to openai_config.py")
-                else:
-                    print("⚠️ Could not locate API key line in openai_config.py")
-                    success = False
-            else:
-                print("⚠️ openai_config.py not found")
-                success = False
+            # Keep any other saved settings
+            try:
+                config = read_json(config_path)
+            except FileNotFoundError:
+                config = {}
+            config["api_key"] = api_key
+            write_json(config_path, config, pretty=True)
+            
+            print("✅ API key saved to openai_config.json")
         except Exception as e:
             print(f"❌ Error saving API key to config file: {str(e)}")
             success = False
     
     # Save to environment variable
     if save_to_env:
-        # For Windows, use setx command
+        # For Windows, write the user environment in the registry (what setx does)
         if os.name == 'nt':
             try:
-                os.system(f'setx OPENAI_API_KEY "{api_key}"')
+                set_user_environment_variable('OPENAI_API_KEY', api_key)
                 print("✅ API key saved to environment variable (will be available in new terminal sessions)")
             except Exception as e:
                 print(f"❌ Error setting environment variable: {str(e)}")
@@ -76,6 +76,14 @@ def test_api_key(api_key):
     """Test the API key by making a simple request to OpenAI API"""
     print("\nTesting API key with a simple request...")
     
+    # Imported here so the prompts don't wait on the OpenAI SDK's import time
+    try:
+        from openai import OpenAI
+    except ImportError:
+        print("Error: OpenAI Python package not found.")
+        print("Please install it first with: pip install openai")
+        return False
+    
     try:
         client = OpenAI(api_key=api_key)
         response = client.chat.completions.create(
@@ -110,7 +118,15 @@ def main():
     
     # Check if API key is already set in environment
     existing_key = os.environ.get('OPENAI_API_KEY')
-    if existing_key:
+    if not sys.stdin.isatty():
+        # Driven by a pipe or another program: no terminal prompts, use the
+        # environment key or read the key from the first line of input
+        if existing_key:
+            print("\nUsing existing API key from environment variable.")
+            api_key = existing_key
+        else:
+            api_key = sys.stdin.readline().strip()
+    elif existing_key:
         print("\nFound existing API key in environment variable.")
         use_existing = input("Do you want to use this key? (y/n): ").lower().strip()
         if use_existing == 'y':
@@ -124,7 +140,7 @@ def main():
     if test_api_key(api_key):
         # Ask where to save the API key
         print("\nWhere would you like to save your API key?")
-        print("1. Save in configuration file (openai_config.py)")
+        print("1. Save in configuration file (openai_config.json)")
         print("2. Save as environment variable")
         print("3. Save in both places")
         print("4. Don't save (not recommended)")
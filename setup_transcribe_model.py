@@ -12,14 +12,17 @@ It updates the transcribe_config.py file with your selected configuration.
 
 import os
 import sys
-import json
+import ast
+import copy
 import argparse
+import pprint
 import shutil
-import re
+from functools import lru_cache
 from getpass import getpass
 
-def load_config():
-    """Load the transcription configuration."""
+@lru_cache(maxsize=1)
+def _read_config():
+    """Import the transcription configuration once per process."""
     try:
         from transcribe_config import TRANSCRIBE_CONFIG, OUTPUT_CONFIG, MODEL_CAPABILITIES
         return TRANSCRIBE_CONFIG, OUTPUT_CONFIG, MODEL_CAPABILITIES
@@ -27,8 +30,51 @@ def load_config():
         print("Error: Could not import transcribe_config.py. Make sure the file exists.")
         sys.exit(1)
 
+def load_config():
+    """Load the transcription configuration (callers get copies they can change)."""
+    # The module exposes read-only mappings; copy them into plain dicts
+    return tuple(copy.deepcopy(dict(section)) for section in _read_config())
+
+def _find_dict_span(src, name):
+    """
+    Return the (start, end) slice of the dict literal assigned to name in src
+
+    Scans once from the opening brace, counting brace depth and skipping over
+    quoted strings so braces inside values don't count.
+    """
+    start = src.index('{', src.index(name))
+    depth = 0
+    quote = None
+    k = start
+    while k < len(src):
+        ch = src[k]
+        if quote:
+            if ch == '\\':
+                k += 1  # Skip the escaped character
+            elif ch == quote:
+                quote = None
+        elif ch in ('"', "'"):
+            quote = ch
+        elif ch == '#':
+            # Skip comments to the end of the line
+            k = src.find('\n', k)
+            if k < 0:
+                break
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return start, k + 1
+        k += 1
+    raise ValueError(f"Unterminated {name} dictionary")
+
 def save_config(config):
-    """Save the updated configuration to transcribe_config.py."""
+    """
+    Save the updated configuration to transcribe_config.py.
+    
+    Returns True if the file was rewritten, False if nothing had changed.
+    """
     # Read the existing file content
     try:
         with open('transcribe_config.py', 'r', encoding='utf-8') as f:
@@ -37,36 +83,87 @@ def save_config(config):
         print("Error: transcribe_config.py not found.")
         sys.exit(1)
     
+    # Leave the file (and its backup) alone if the settings are the same
+    name_start = content.index("TRANSCRIBE_CONFIG")
+    start, end = _find_dict_span(content, "TRANSCRIBE_CONFIG")
+    try:
+        unchanged = ast.literal_eval(content[start:end]) == config
+    except (ValueError, SyntaxError):
+        unchanged = False
+    if unchanged:
+        print("No changes.")
+        return False
+    
     # Create a backup
     shutil.copy2('transcribe_config.py', 'transcribe_config.py.bak')
     print(f"Created backup: transcribe_config.py.bak")
     
-    # Find the TRANSCRIBE_CONFIG dictionary and update it
-    pattern = r"TRANSCRIBE_CONFIG\s*=\s*\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}"
-    config_str = "TRANSCRIBE_CONFIG = " + json.dumps(config, indent=4).replace("null", "None").replace("true", "True").replace("false", "False")
-    
-    # Replace single quotes for string values but keep "None", "True", "False" as is
-    config_str = re.sub(r'"([^"]+)":', r"'\1':", config_str)  # Replace double quotes in keys with single quotes
-    config_str = re.sub(r':\s*"([^"]+)"', r": '\1'", config_str)  # Replace double quotes for string values with single quotes
+    # pprint writes Python literals directly (None/True/False, quoted strings)
+    config_str = "TRANSCRIBE_CONFIG = " + pprint.pformat(config, indent=4, sort_dicts=False)
     
-    updated_content = re.sub(pattern, config_str, content, flags=re.DOTALL)
+    # Splice the new assignment in place of the old one
+    updated_content = content[:name_start] + config_str + content[end:]
     
-    # Write the updated content back to the file
-    with open('transcribe_config.py', 'w', encoding='utf-8') as f:
+    # Write a temporary file and swap it in, so a crash can't leave a truncated config
+    tmp_path = 'transcribe_config.py.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         f.write(updated_content)
+    os.replace(tmp_path, 'transcribe_config.py')
     
     print("Configuration updated successfully!")
+    return True
 
 def test_openai_api(api_key):
     """Test if the OpenAI API key is valid."""
     try:
         import openai
-        client = openai.OpenAI(api_key=api_key)
-        models = client.models.list()
+        # Short timeout so a hung network doesn't stall the setup prompts
+        client = openai.OpenAI(api_key=api_key, timeout=5)
+        # One model lookup checks the key without listing the whole catalog
+        client.models.retrieve("whisper-1")
         return True, "API key is valid. Connection to OpenAI successful."
     except Exception as e:
         return False, f"Error connecting to OpenAI API: {str(e)}"
 
+def _optional_text(raw):
+    """Prompt parser: any text, empty meaning None"""
+    return True, raw or None
+
+def _text(raw):
+    """Prompt parser: any text, including empty"""
+    return True, raw
+
+def _one_of(choices):
+    """Prompt parser factory: one of choices, anything else keeps the current value"""
+    def parse(raw):
+        return raw in choices, raw
+    return parse
+
+def _float_between(low, high):
+    """Prompt parser factory: a number from low to high, anything else keeps the current value"""
+    def parse(raw):
+        try:
+            value = float(raw)
+        except ValueError:
+            return False, None
+        return low <= value <= high, value
+    return parse
+
+def _api_fields(formats):
+    """Advanced settings prompts for an OpenAI transcription API: (field, prompt, parser)"""
+    return [
+        ("language", "Language code (e.g., 'en', leave empty for auto-detection)", _optional_text),
+        ("prompt", "Processing prompt (context to help guide transcription)", _text),
+        ("response_format", "Response format (" + ", ".join(formats) + ") [{current}]", _one_of(formats)),
+        ("temperature", "Temperature (0.0-1.0) [{current}]", _float_between(0.0, 1.0)),
+    ]
+
+# Advanced settings by model type: (TRANSCRIBE_CONFIG section, prompts)
+ADVANCED_FIELDS = {
+    "whisper-1": ("whisper_api", _api_fields(["text", "vtt", "srt", "verbose_json", "json"])),
+    "4o-transcribe": ("4o_transcribe", _api_fields(["text", "json"])),
+}
+
 def interactive_setup():
     """Interactive setup for transcription model configuration."""
     current_config, output_config, model_capabilities = load_config()
@@ -139,53 +236,12 @@ def interactive_setup():
         advanced = input().lower() == 'y'
         
         if advanced:
-            if choice == 2:
-                # Whisper-1 advanced settings
-                config_section = current_config["whisper_api"]
-                
-                language = input("Language code (e.g., 'en', leave empty for auto-detection): ").strip()
-                config_section["language"] = language if language else None
-                
-                prompt = input("Processing prompt (context to help guide transcription): ").strip()
-                config_section["prompt"] = prompt
-                
-                formats = ["text", "vtt", "srt", "verbose_json", "json"]
-                print(f"Available formats: {', '.join(formats)}")
-                format_choice = input(f"Response format [{config_section['response_format']}]: ").strip()
-                if format_choice in formats:
-                    config_section["response_format"] = format_choice
-                
-                temp = input(f"Temperature (0.0-1.0) [{config_section['temperature']}]: ").strip()
-                try:
-                    temp_val = float(temp)
-                    if 0.0 <= temp_val <= 1.0:
-                        config_section["temperature"] = temp_val
-                except ValueError:
-                    pass  # Keep default if invalid
-            
-            else:
-                # 4o-transcribe advanced settings
-                config_section = current_config["4o_transcribe"]
-                
-                language = input("Language code (e.g., 'en', leave empty for auto-detection): ").strip()
-                config_section["language"] = language if language else None
-                
-                prompt = input("Processing prompt (context to help guide transcription): ").strip()
-                config_section["prompt"] = prompt
-                
-                formats = ["text", "json"]
-                print(f"Available formats: {', '.join(formats)}")
-                format_choice = input(f"Response format [{config_section['response_format']}]: ").strip()
-                if format_choice in formats:
-                    config_section["response_format"] = format_choice
-                
-                temp = input(f"Temperature (0.0-1.0) [{config_section['temperature']}]: ").strip()
-                try:
-                    temp_val = float(temp)
-                    if 0.0 <= temp_val <= 1.0:
-                        config_section["temperature"] = temp_val
-                except ValueError:
-                    pass  # Keep default if invalid
+            section_name, fields = ADVANCED_FIELDS[current_config["model_type"]]
+            config_section = current_config[section_name]
+            for field, label, parse in fields:
+                ok, value = parse(input(label.format(current=config_section[field]) + ": ").strip())
+                if ok:
+                    config_section[field] = value  # Otherwise keep the current value
     
     # Common settings for all models
     print("\n== Common Settings ==")
@@ -284,8 +340,8 @@ def command_line_setup(args):
         print("API key configured")
     
     if args.model or args.api_key:
-        save_config(current_config)
-        print("Configuration updated successfully")
+        if save_config(current_config):
+            print("Configuration updated successfully")
 
 def main():
     """Main function to run the setup process."""
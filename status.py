@@ -10,23 +10,27 @@ This script displays the current status and configuration of the audio diary sys
 """
 
 import os
+import re
 import sys
-import json
+import stat
+import time
 import datetime
-import argparse
-from pathlib import Path
-import textwrap
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+from cfg_io import read_json
+
+@lru_cache(maxsize=1)
 def load_main_config():
     """Load the main configuration from config.json"""
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return read_json('config.json')
     except Exception as e:
         print(f"Error loading config.json: {str(e)}")
         return {}
 
+@lru_cache(maxsize=1)
 def load_transcribe_config():
     """Load the transcription configuration"""
     try:
@@ -36,6 +40,7 @@ def load_transcribe_config():
         print("Transcription config not found. Run setup_transcribe_model.py to configure.")
         return {}, {}, {}
 
+@lru_cache(maxsize=1)
 def load_openai_config():
     """Load the OpenAI processing configuration"""
     try:
@@ -45,124 +50,158 @@ def load_openai_config():
         print("OpenAI config not found. Run setup_openai.py to configure.")
         return {}
 
-def check_api_keys():
-    """Check for API keys in configs and environment"""
-    keys = {
+def check_api_keys(transcribe_config, openai_config):
+    """Check for API keys in the loaded configs and environment"""
+    return {
         "OPENAI_API_KEY": {
             "env": os.environ.get("OPENAI_API_KEY") is not None,
-            "transcribe_config": False,
-            "openai_config": False
+            "transcribe_config": bool(transcribe_config.get("api_key", "")),
+            "openai_config": bool(openai_config.get("api_key", ""))
         }
     }
-    
-    # Check transcribe_config
+
+# Extensions counted as audio files, compared in lower case
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.m4a', '.wav', '.ogg', '.flac'})
+
+# Model line in a received transcription's header
+MODEL_RE = re.compile(rb'^# Model:[ \t]*(.+)$', re.MULTILINE)
+
+# Threads reading transcription headers at the same time
+HEADER_READ_WORKERS = 16
+
+def read_model_header(path):
+    """Return the model named in a transcription's header, or None"""
     try:
-        from transcribe_config import TRANSCRIBE_CONFIG
-        keys["OPENAI_API_KEY"]["transcribe_config"] = bool(TRANSCRIBE_CONFIG.get("api_key", ""))
-    except:
-        pass
-    
-    # Check openai_config
+        with open(path, 'rb') as f:
+            match = MODEL_RE.search(f.read(200))
+    except OSError:
+        return None
+    if match:
+        return match.group(1).decode('utf-8', errors='ignore').strip()
+    return None
+
+def scan_audio_dir(path):
+    """Count the audio files in a directory and find the newest one's mtime, in one pass"""
+    count = 0
+    latest_mtime = None
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                count += 1
+                mtime = entry.stat(follow_symlinks=False).st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_mtime = mtime
+    return count, latest_mtime
+
+# Format used for every "Last modified" time
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def format_mtime(timestamp):
+    """Format a file timestamp in local time, without building a datetime"""
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+def stat_or_none(path):
+    """Return os.stat(path), or None if it doesn't exist (one stat call for both checks)"""
     try:
-        from openai_config import OPENAI_CONFIG
-        keys["OPENAI_API_KEY"]["openai_config"] = bool(OPENAI_CONFIG.get("api_key", ""))
-    except:
-        pass
-    
-    return keys
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def count_in_file(path, pattern, chunk_size=65536):
+    """Count occurrences of a two-byte pattern in a file, reading it in chunks"""
+    count = 0
+    previous = b''
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            # Carry the last byte over so a match split across chunks is still found
+            data = previous + chunk
+            count += data.count(pattern)
+            previous = data[-1:]
+    return count
 
 def get_file_stats():
     """Get statistics about important files"""
     stats = {}
     
-    # Check download directory
-    download_path = Path("./downloads")
-    if download_path.exists() and download_path.is_dir():
-        audio_files = list(download_path.glob("*.mp3")) + list(download_path.glob("*.m4a")) + \
-                      list(download_path.glob("*.wav")) + list(download_path.glob("*.ogg")) + \
-                      list(download_path.glob("*.flac"))
-        stats["downloads"] = {
-            "exists": True,
-            "audio_files": len(audio_files),
-            "last_modified": datetime.datetime.fromtimestamp(download_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S") if audio_files else "N/A"
-        }
-    else:
-        stats["downloads"] = {"exists": False}
-    
-    # Check processed directory
-    processed_path = Path("./processed_audio")
-    if processed_path.exists() and processed_path.is_dir():
-        audio_files = list(processed_path.glob("*.mp3")) + list(processed_path.glob("*.m4a")) + \
-                      list(processed_path.glob("*.wav")) + list(processed_path.glob("*.ogg")) + \
-                      list(processed_path.glob("*.flac"))
-        stats["processed"] = {
-            "exists": True,
-            "audio_files": len(audio_files),
-            "last_modified": datetime.datetime.fromtimestamp(processed_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S") if audio_files else "N/A"
-        }
-    else:
-        stats["processed"] = {"exists": False}
+    # Check the download and processed audio directories
+    for key, audio_path in (("downloads", "./downloads"), ("processed", "./processed_audio")):
+        if os.path.isdir(audio_path):
+            audio_count, latest_mtime = scan_audio_dir(audio_path)
+            stats[key] = {
+                "exists": True,
+                "audio_files": audio_count,
+                "last_modified": format_mtime(latest_mtime) if audio_count else "N/A"
+            }
+        else:
+            stats[key] = {"exists": False}
     
     # Check received transcriptions directory
-    received_path = Path("./received_transcriptions")
-    if received_path.exists() and received_path.is_dir():
-        transcription_files = list(received_path.glob("*.txt"))
+    received_path = "./received_transcriptions"
+    received_stat = stat_or_none(received_path)
+    if received_stat and stat.S_ISDIR(received_stat.st_mode):
+        with os.scandir(received_path) as entries:
+            transcription_files = [entry for entry in entries
+                                   if entry.name.endswith(".txt") and entry.is_file()]
         
-        # Count transcriptions by model type
-        model_counts = {}
-        for file in transcription_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read(200)  # Read just the header
-                    if "# Model:" in content:
-                        model_line = [line for line in content.split('\n') if "# Model:" in line][0]
-                        model_type = model_line.replace("# Model:", "").strip()
-                        model_counts[model_type] = model_counts.get(model_type, 0) + 1
-            except:
-                pass
+        # Count transcriptions by the model named in their header; the reads
+        # are latency bound, so several are kept in flight at once
+        with ThreadPoolExecutor(max_workers=HEADER_READ_WORKERS) as executor:
+            models = executor.map(read_model_header, [entry.path for entry in transcription_files])
+            model_counts = dict(Counter(model for model in models if model))
         
         stats["received_transcriptions"] = {
             "exists": True,
             "files": len(transcription_files),
             "model_counts": model_counts,
-            "last_modified": datetime.datetime.fromtimestamp(received_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S") if transcription_files else "N/A"
+            "last_modified": format_mtime(received_stat.st_mtime) if transcription_files else "N/A"
         }
     else:
         stats["received_transcriptions"] = {"exists": False}
     
+    # Sort the working directory's files into transcription, to-do and diary in one pass
+    transcription_stat = None
+    todo_stat = None
+    diary_entries = []
+    with os.scandir(".") as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if entry.name == "transcription.txt":
+                transcription_stat = entry.stat()
+            elif entry.name == "to_do.txt":
+                todo_stat = entry.stat()
+            elif entry.name.endswith("_ongoing_entries.txt"):
+                diary_entries.append((entry.stat().st_mtime, entry.name))
+    
     # Check transcription file
-    transcription_path = Path("transcription.txt")
-    if transcription_path.exists() and transcription_path.is_file():
+    if transcription_stat:
         stats["transcription"] = {
             "exists": True,
-            "size": f"{transcription_path.stat().st_size / 1024:.2f} KB",
-            "last_modified": datetime.datetime.fromtimestamp(transcription_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            "size": f"{transcription_stat.st_size / 1024:.2f} KB",
+            "last_modified": format_mtime(transcription_stat.st_mtime)
         }
     else:
         stats["transcription"] = {"exists": False}
     
     # Check diary entries
-    diary_files = list(Path(".").glob("*_ongoing_entries.txt"))
-    if diary_files:
+    if diary_entries:
+        latest_mtime, latest_name = max(diary_entries)
         stats["diary"] = {
             "exists": True,
-            "files": len(diary_files),
-            "latest": max(diary_files, key=lambda p: p.stat().st_mtime).name,
-            "last_modified": datetime.datetime.fromtimestamp(max(diary_files, key=lambda p: p.stat().st_mtime).stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            "files": len(diary_entries),
+            "latest": latest_name,
+            "last_modified": format_mtime(latest_mtime)
         }
     else:
         stats["diary"] = {"exists": False}
     
     # Check to-do file
-    todo_path = Path("to_do.txt")
-    if todo_path.exists() and todo_path.is_file():
-        with open(todo_path, 'r', encoding='utf-8') as f:
-            todo_content = f.read()
+    if todo_stat:
         stats["todo"] = {
             "exists": True,
-            "size": f"{todo_path.stat().st_size / 1024:.2f} KB",
-            "items": todo_content.count("- "),
-            "last_modified": datetime.datetime.fromtimestamp(todo_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            "size": f"{todo_stat.st_size / 1024:.2f} KB",
+            "items": count_in_file("to_do.txt", b"- "),
+            "last_modified": format_mtime(todo_stat.st_mtime)
         }
     else:
         stats["todo"] = {"exists": False}
@@ -177,8 +216,11 @@ def format_as_table(data, headers=None, column_widths=None):
     if headers:
         data = [headers] + data
     
+    # Convert every cell to a string once, for both the widths and the output
+    rows = [[str(item) for item in row] for row in data]
+    
     if not column_widths:
-        column_widths = [max(len(str(row[i])) for row in data) for i in range(len(data[0]))]
+        column_widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
     
     # Create the format string based on column widths
     format_str = " | ".join(f"{{:{width}}}" for width in column_widths)
@@ -188,13 +230,48 @@ def format_as_table(data, headers=None, column_widths=None):
     
     # Format the table
     result = []
-    for i, row in enumerate(data):
-        result.append(format_str.format(*[str(item) for item in row]))
+    for i, row in enumerate(rows):
+        result.append(format_str.format(*row))
         if i == 0 and headers:
             result.append(separator)
     
     return "\n".join(result)
 
+def find_last_line(path, marker, chunk_size=8192):
+    """
+    Return the last line of a file that contains marker (bytes), or None
+
+    The file is read backwards in chunks like tail, so only the part after the
+    match is read, however long the file has grown.
+    """
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b''
+        while pos > 0:
+            read_size = min(chunk_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            lines = (f.read(read_size) + partial).split(b'\n')
+            # The first piece may be the end of a line that starts in an earlier chunk
+            partial = lines.pop(0) if pos > 0 else b''
+            for line in reversed(lines):
+                if marker in line:
+                    return line.decode('utf-8', errors='ignore')
+    return None
+
+def parse_log_timestamp(text):
+    """
+    Parse a logging timestamp like "2024-01-02 03:04:05,123"
+
+    The format is fixed, so the fields are sliced out directly instead of
+    going through strptime.
+    """
+    if len(text) != 23 or text[19] != ',':
+        raise ValueError(f"Unexpected log timestamp: {text!r}")
+    return datetime.datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                             int(text[11:13]), int(text[14:16]), int(text[17:19]),
+                             int(text[20:23]) * 1000)
+
 def get_next_run_time(config):
     """Get the next scheduled run time based on config"""
     runs_per_day = config.get("scheduler", {}).get("runs_per_day", 1)
@@ -210,18 +287,16 @@ def get_next_run_time(config):
     log_file = config.get("scheduler", {}).get("log_file", "pipeline_scheduler.log")
     last_run_time = None
     
-    if os.path.exists(log_file):
+    # One stat answers both "does it exist" and "is there anything to scan"
+    log_stat = stat_or_none(log_file)
+    if log_stat and log_stat.st_size > 0:
         try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                
-            # Search for "Starting pipeline execution" lines in reverse
-            for line in reversed(lines):
-                if "Starting pipeline execution" in line:
-                    # Extract timestamp
-                    timestamp_part = line.split(" - ")[0].strip()
-                    last_run_time = datetime.datetime.strptime(timestamp_part, "%Y-%m-%d %H:%M:%S,%f")
-                    break
+            # Find the last "Starting pipeline execution" line, reading from the end
+            line = find_last_line(log_file, b"Starting pipeline execution")
+            if line:
+                # Extract timestamp
+                timestamp_part = line.split(" - ")[0].strip()
+                last_run_time = parse_log_timestamp(timestamp_part)
         except:
             pass
     
@@ -237,40 +312,58 @@ def get_next_run_time(config):
     else:
         return "Unknown (no previous runs found)"
 
+def _local_model_info(transcribe_config):
+    """Describe the local Whisper model"""
+    local = transcribe_config.get("local_model", {})
+    model_name = local.get("model_name", "base")
+    device = local.get("device", "cpu")
+    return {
+        "type": "Local Whisper",
+        "model": f"{model_name} (running on {device})",
+        "endpoint": "N/A (local processing)",
+        "details": f"Local whisper model stored in {local.get('model_directory', './model')}"
+    }
+
+def _whisper_api_info(transcribe_config):
+    """Describe the OpenAI Whisper API model"""
+    api = transcribe_config.get("whisper_api", {})
+    return {
+        "type": "OpenAI Whisper API",
+        "model": "whisper-1",
+        "endpoint": "https://api.openai.com/v1/audio/transcriptions",
+        "details": f"Response format: {api.get('response_format', 'text')}, Language: {api.get('language', 'auto-detect')}"
+    }
+
+def _4o_transcribe_info(transcribe_config):
+    """Describe the OpenAI 4o Transcribe model"""
+    api = transcribe_config.get("4o_transcribe", {})
+    return {
+        "type": "OpenAI 4o Transcribe",
+        "model": api.get("model", "gpt-4o"),
+        "endpoint": "https://api.openai.com/v1/chat/completions",
+        "details": f"Response format: {api.get('response_format', 'text')}, Language: {api.get('language', 'auto-detect')}"
+    }
+
+def _unknown_model_info(transcribe_config):
+    """Describe an unrecognised transcription model type"""
+    return {
+        "type": "Unknown",
+        "model": "N/A",
+        "endpoint": "N/A",
+        "details": "Unknown transcription model type"
+    }
+
+# Model info builders by TRANSCRIBE_CONFIG model_type
+TRANSCRIBE_MODEL_INFO = {
+    "local": _local_model_info,
+    "whisper-1": _whisper_api_info,
+    "4o-transcribe": _4o_transcribe_info,
+}
+
 def get_transcribe_model_info(transcribe_config):
     """Get information about the transcription model"""
     model_type = transcribe_config.get("model_type", "local")
-    
-    if model_type == "local":
-        model_name = transcribe_config.get("local_model", {}).get("model_name", "base")
-        device = transcribe_config.get("local_model", {}).get("device", "cpu")
-        return {
-            "type": "Local Whisper",
-            "model": f"{model_name} (running on {device})",
-            "endpoint": "N/A (local processing)",
-            "details": f"Local whisper model stored in {transcribe_config.get('local_model', {}).get('model_directory', './model')}"
-        }
-    elif model_type == "whisper-1":
-        return {
-            "type": "OpenAI Whisper API",
-            "model": "whisper-1",
-            "endpoint": "https://api.openai.com/v1/audio/transcriptions",
-            "details": f"Response format: {transcribe_config.get('whisper_api', {}).get('response_format', 'text')}, Language: {transcribe_config.get('whisper_api', {}).get('language', 'auto-detect')}"
-        }
-    elif model_type == "4o-transcribe":
-        return {
-            "type": "OpenAI 4o Transcribe",
-            "model": transcribe_config.get("4o_transcribe", {}).get("model", "gpt-4o"),
-            "endpoint": "https://api.openai.com/v1/chat/completions",
-            "details": f"Response format: {transcribe_config.get('4o_transcribe', {}).get('response_format', 'text')}, Language: {transcribe_config.get('4o_transcribe', {}).get('language', 'auto-detect')}"
-        }
-    else:
-        return {
-            "type": "Unknown",
-            "model": "N/A",
-            "endpoint": "N/A",
-            "details": "Unknown transcription model type"
-        }
+    return TRANSCRIBE_MODEL_INFO.get(model_type, _unknown_model_info)(transcribe_config)
 
 def get_openai_model_info(openai_config):
     """Get information about the OpenAI instruction model"""
@@ -295,128 +388,137 @@ def display_system_status(args):
     main_config = load_main_config()
     transcribe_config, output_config, model_capabilities = load_transcribe_config()
     openai_config = load_openai_config()
-    api_keys = check_api_keys()
-    file_stats = get_file_stats()
+    api_keys = check_api_keys(transcribe_config, openai_config)
+    
+    # Collect the report and write it out in one go
+    out = []
     
     # Header
-    print("\n" + "=" * 80)
-    print(" " * 25 + "AUDIO DIARY SYSTEM STATUS")
-    print("=" * 80)
+    out.append("\n" + "=" * 80)
+    out.append(" " * 25 + "AUDIO DIARY SYSTEM STATUS")
+    out.append("=" * 80)
     
     # Scheduler information
-    print("\n📅 SCHEDULER")
-    print("-" * 80)
+    out.append("\n📅 SCHEDULER")
+    out.append("-" * 80)
     runs_per_day = main_config.get("scheduler", {}).get("runs_per_day", 1)
     
     if runs_per_day == 0:
-        print("Mode: One-time run (no scheduling)")
+        out.append("Mode: One-time run (no scheduling)")
     else:
-        print(f"Runs per day: {runs_per_day}")
-        print(f"Interval: Every {86400 // runs_per_day} seconds ({86400 // runs_per_day // 60} minutes)")
-        print(f"Next scheduled run: {get_next_run_time(main_config)}")
+        out.append(f"Runs per day: {runs_per_day}")
+        out.append(f"Interval: Every {86400 // runs_per_day} seconds ({86400 // runs_per_day // 60} minutes)")
+        out.append(f"Next scheduled run: {get_next_run_time(main_config)}")
     
     # Transcription model information
-    print("\n🎤 TRANSCRIPTION MODEL")
-    print("-" * 80)
+    out.append("\n🎤 TRANSCRIPTION MODEL")
+    out.append("-" * 80)
     transcribe_info = get_transcribe_model_info(transcribe_config)
-    print(f"Type: {transcribe_info['type']}")
-    print(f"Model: {transcribe_info['model']}")
-    print(f"Endpoint: {transcribe_info['endpoint']}")
-    print(f"Details: {transcribe_info['details']}")
+    out.append(f"Type: {transcribe_info['type']}")
+    out.append(f"Model: {transcribe_info['model']}")
+    out.append(f"Endpoint: {transcribe_info['endpoint']}")
+    out.append(f"Details: {transcribe_info['details']}")
     
     if transcribe_config.get("chunk_audio", False):
         chunk_size_minutes = transcribe_config.get("max_chunk_size", 24 * 60 * 1000) // (60 * 1000)
-        print(f"Audio chunking: Enabled (max chunk size: {chunk_size_minutes} minutes)")
+        out.append(f"Audio chunking: Enabled (max chunk size: {chunk_size_minutes} minutes)")
     else:
-        print("Audio chunking: Disabled")
+        out.append("Audio chunking: Disabled")
     
     # OpenAI instruction model information
-    print("\n🧠 INSTRUCTION MODEL")
-    print("-" * 80)
+    out.append("\n🧠 INSTRUCTION MODEL")
+    out.append("-" * 80)
     if openai_config:
         openai_info = get_openai_model_info(openai_config)
-        print(f"Type: {openai_info['type']}")
-        print(f"Model: {openai_info['model']}")
-        print(f"Endpoint: {openai_info['endpoint']}")
-        print(f"Details: {openai_info['details']}")
+        out.append(f"Type: {openai_info['type']}")
+        out.append(f"Model: {openai_info['model']}")
+        out.append(f"Endpoint: {openai_info['endpoint']}")
+        out.append(f"Details: {openai_info['details']}")
         
         # Cost information
-        if "cost_estimates" in args and "COST_ESTIMATES" in dir(openai_config):
-            print("\nCost estimates:")
+        if args.get("cost_estimates") and "COST_ESTIMATES" in dir(openai_config):
+            out.append("\nCost estimates:")
             for model, costs in openai_config.COST_ESTIMATES.items():
-                print(f"  - {model}: ${costs['input']}/1K tokens (input), ${costs['output']}/1K tokens (output)")
+                out.append(f"  - {model}: ${costs['input']}/1K tokens (input), ${costs['output']}/1K tokens (output)")
     else:
-        print("OpenAI configuration not found. Run setup_openai.py to configure.")
+        out.append("OpenAI configuration not found. Run setup_openai.py to configure.")
     
     # API Keys status
-    print("\n🔑 API KEYS")
-    print("-" * 80)
+    out.append("\n🔑 API KEYS")
+    out.append("-" * 80)
     for key_name, sources in api_keys.items():
         sources_found = [source for source, found in sources.items() if found]
         if sources_found:
-            print(f"{key_name}: ✅ Configured in {', '.join(sources_found)}")
+            out.append(f"{key_name}: ✅ Configured in {', '.join(sources_found)}")
         else:
-            print(f"{key_name}: ❌ Not configured")
+            out.append(f"{key_name}: ❌ Not configured")
     
     # File statistics
-    if "files" in args:
-        print("\n📁 FILE STATISTICS")
-        print("-" * 80)
+    if args.get("files"):
+        # Only scanned when asked for
+        file_stats = get_file_stats()
+        out.append("\n📁 FILE STATISTICS")
+        out.append("-" * 80)
         
         # Downloads directory
         if file_stats["downloads"]["exists"]:
-            print(f"Downloads directory: {file_stats['downloads']['audio_files']} audio files")
+            out.append(f"Downloads directory: {file_stats['downloads']['audio_files']} audio files")
             if file_stats["downloads"]["audio_files"] > 0:
-                print(f"  Last modified: {file_stats['downloads']['last_modified']}")
+                out.append(f"  Last modified: {file_stats['downloads']['last_modified']}")
         else:
-            print("Downloads directory: Not found")
+            out.append("Downloads directory: Not found")
         
         # Processed directory
         if file_stats["processed"]["exists"]:
-            print(f"Processed directory: {file_stats['processed']['audio_files']} audio files")
+            out.append(f"Processed directory: {file_stats['processed']['audio_files']} audio files")
             if file_stats["processed"]["audio_files"] > 0:
-                print(f"  Last modified: {file_stats['processed']['last_modified']}")
+                out.append(f"  Last modified: {file_stats['processed']['last_modified']}")
         else:
-            print("Processed directory: Not found")
+            out.append("Processed directory: Not found")
         
         # Received transcriptions directory
         if file_stats["received_transcriptions"]["exists"]:
-            print(f"Received transcriptions: {file_stats['received_transcriptions']['files']} files")
+            out.append(f"Received transcriptions: {file_stats['received_transcriptions']['files']} files")
             if file_stats["received_transcriptions"]["model_counts"]:
-                print("  Model breakdown:")
+                out.append("  Model breakdown:")
                 for model, count in file_stats["received_transcriptions"]["model_counts"].items():
-                    print(f"    - {model}: {count} transcriptions")
+                    out.append(f"    - {model}: {count} transcriptions")
             if file_stats["received_transcriptions"]["files"] > 0:
-                print(f"  Last modified: {file_stats['received_transcriptions']['last_modified']}")
+                out.append(f"  Last modified: {file_stats['received_transcriptions']['last_modified']}")
         else:
-            print("Received transcriptions: Not found")
+            out.append("Received transcriptions: Not found")
         
         # Transcription file
         if file_stats["transcription"]["exists"]:
-            print(f"Transcription file: {file_stats['transcription']['size']}")
-            print(f"  Last modified: {file_stats['transcription']['last_modified']}")
+            out.append(f"Transcription file: {file_stats['transcription']['size']}")
+            out.append(f"  Last modified: {file_stats['transcription']['last_modified']}")
         else:
-            print("Transcription file: Not found")
+            out.append("Transcription file: Not found")
         
         # Diary entries
         if file_stats["diary"]["exists"]:
-            print(f"Diary entries: {file_stats['diary']['files']} files")
-            print(f"  Latest file: {file_stats['diary']['latest']}")
-            print(f"  Last modified: {file_stats['diary']['last_modified']}")
+            out.append(f"Diary entries: {file_stats['diary']['files']} files")
+            out.append(f"  Latest file: {file_stats['diary']['latest']}")
+            out.append(f"  Last modified: {file_stats['diary']['last_modified']}")
         else:
-            print("Diary entries: Not found")
+            out.append("Diary entries: Not found")
         
         # To-do file
         if file_stats["todo"]["exists"]:
-            print(f"To-do file: {file_stats['todo']['size']} ({file_stats['todo']['items']} items)")
-            print(f"  Last modified: {file_stats['todo']['last_modified']}")
+            out.append(f"To-do file: {file_stats['todo']['size']} ({file_stats['todo']['items']} items)")
+            out.append(f"  Last modified: {file_stats['todo']['last_modified']}")
         else:
-            print("To-do file: Not found")
+            out.append("To-do file: Not found")
+    
+    out.append("\n" + "=" * 80)
     
-    print("\n" + "=" * 80)
+    sys.stdout.write("\n".join(out) + "\n")
 
 def parse_args():
     """Parse command line arguments"""
+    # Only needed when run as a script, not when the helpers are imported
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Display audio diary system status")
     parser.add_argument("--files", action="store_true", help="Include file statistics")
     parser.add_argument("--cost-estimates", action="store_true", help="Include cost estimates for OpenAI API")
@@ -6,6 +6,8 @@ This file contains settings for different transcription models:
 3. OpenAI 4o Transcribe API
 """
 
+from types import MappingProxyType
+
 # Transcription model configuration
 TRANSCRIBE_CONFIG = {
     'model_type': 'whisper-1',
@@ -31,6 +33,7 @@ TRANSCRIBE_CONFIG = {
     },
     'chunk_audio': False,
     'max_chunk_size': 1440000,
+    'max_concurrent_requests': 8,
     'vad_filter': False,
     'vad_threshold': 0.5
 }
@@ -47,21 +50,26 @@ OUTPUT_CONFIG = {
 # Meta-information about model capabilities
 MODEL_CAPABILITIES = {
     "local": {
-        "languages": ["en", "zh", "de", "es", "ru", "ko", "fr", "ja", "pt", "tr", "pl", "ca", "nl", "ar", "sv", "it", "id", "hi", "fi", "vi", "he", "uk", "el", "ms", "cs", "ro", "da", "hu", "ta", "no", "th", "ur", "hr", "bg", "lt", "la", "mi", "ml", "cy", "sk", "te", "fa", "lv", "bn", "sr", "az", "sl", "kn", "et", "mk", "br", "eu", "is", "hy", "ne", "mn", "bs", "kk", "sq", "sw", "gl", "mr", "pa", "si", "km", "sn", "yo", "so", "af", "oc", "ka", "be", "tg", "sd", "gu", "am", "yi", "lo", "uz", "fo", "ht", "ps", "tk", "nn", "mt", "sa", "lb", "my", "bo", "tl", "mg", "as", "tt", "haw", "ln", "ha", "ba", "jw", "su"],
+        "languages": frozenset({"en", "zh", "de", "es", "ru", "ko", "fr", "ja", "pt", "tr", "pl", "ca", "nl", "ar", "sv", "it", "id", "hi", "fi", "vi", "he", "uk", "el", "ms", "cs", "ro", "da", "hu", "ta", "no", "th", "ur", "hr", "bg", "lt", "la", "mi", "ml", "cy", "sk", "te", "fa", "lv", "bn", "sr", "az", "sl", "kn", "et", "mk", "br", "eu", "is", "hy", "ne", "mn", "bs", "kk", "sq", "sw", "gl", "mr", "pa", "si", "km", "sn", "yo", "so", "af", "oc", "ka", "be", "tg", "sd", "gu", "am", "yi", "lo", "uz", "fo", "ht", "ps", "tk", "nn", "mt", "sa", "lb", "my", "bo", "tl", "mg", "as", "tt", "haw", "ln", "ha", "ba", "jw", "su"}),
         "supports_word_timestamps": True,
         "max_input_length": "25 minutes",
         "chunk_size_required": True,
     },
     "whisper-1": {
-        "languages": ["en"],
+        "languages": frozenset({"en"}),
         "supports_word_timestamps": True,
         "max_input_length": "25 minutes",
         "chunk_size_required": False,
     },
     "4o-transcribe": {
-        "languages": ["all languages"],
+        "languages": frozenset({"all languages"}),
         "supports_word_timestamps": True, 
         "max_input_length": "4 hours",
         "chunk_size_required": False,
     }
-} 
\ No newline at end of file
+} 
+
+# Read-only views, so code importing these settings can't change them by accident
+TRANSCRIBE_CONFIG = MappingProxyType(TRANSCRIBE_CONFIG)
+OUTPUT_CONFIG = MappingProxyType(OUTPUT_CONFIG)
+MODEL_CAPABILITIES = MappingProxyType(MODEL_CAPABILITIES)